@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -19,16 +20,223 @@ class Settings(BaseSettings):
     # Azure Speech Service settings
     AZURE_SUBSCRIPTION_KEY: str = os.getenv("AZURE_SUBSCRIPTION_KEY", "")
     AZURE_SERVICE_REGION: str = os.getenv("AZURE_SERVICE_REGION", "southeastasia")
+    # Overrides the regional endpoint, e.g. to point at the benchmark mock server
+    AZURE_SPEECH_ENDPOINT: str = os.getenv("AZURE_SPEECH_ENDPOINT", "")
 
     # Gemini API settings
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL_ID: str = os.getenv("GEMINI_MODEL_ID", "gemini-2.0-flash-exp")
+    # Overrides the Gemini API base URL (empty uses the SDK default)
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "")
+
+    # Job scheduling: concurrent pipelines overall and per tenant, and the
+    # fair-share weights of tenants as "team-a=3,team-b=1" (default weight 1)
+    MAX_CONCURRENT_JOBS: int = int(os.getenv("MAX_CONCURRENT_JOBS", "4"))
+    TENANT_MAX_CONCURRENT_JOBS: int = int(os.getenv("TENANT_MAX_CONCURRENT_JOBS", "2"))
+    TENANT_WEIGHTS: str = os.getenv("TENANT_WEIGHTS", "")
+
+    # Client-side provider rate limits (0 disables a limit). The "redis" backend
+    # shares the limits between all processes and pods; "memory" is per process
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_REDIS_URL: str = os.getenv(
+        "RATE_LIMIT_REDIS_URL",
+        os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+    )
+    GEMINI_REQUESTS_PER_MINUTE: int = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "0"))
+    GEMINI_TOKENS_PER_MINUTE: int = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "0"))
+    GEMINI_MAX_CONCURRENT_UPLOADS: int = int(
+        os.getenv("GEMINI_MAX_CONCURRENT_UPLOADS", "0")
+    )
+    AZURE_REQUESTS_PER_MINUTE: int = int(os.getenv("AZURE_REQUESTS_PER_MINUTE", "0"))
+    AZURE_MAX_CONCURRENT_UPLOADS: int = int(
+        os.getenv("AZURE_MAX_CONCURRENT_UPLOADS", "0")
+    )
+
+    # OpenTelemetry tracing; the exporter is "otlp" (collector), "file" or "console"
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "file")
+    TRACING_OTLP_ENDPOINT: str = os.getenv(
+        "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    TRACING_FILE_PATH: str = os.getenv(
+        "TRACING_FILE_PATH", str(BASE_DIR / "traces.jsonl")
+    )
+    TRACING_SERVICE_NAME: str = os.getenv(
+        "TRACING_SERVICE_NAME", "interview-analysis-api"
+    )
+
+    # Opt-in profiling of individual jobs (X-Profile header or profile form
+    # field on upload); profiles are read through the admin API
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_INTERVAL_SECONDS: float = float(
+        os.getenv("PROFILING_SAMPLE_INTERVAL_SECONDS", "0.01")
+    )
+    PROFILING_TRACEMALLOC_FRAMES: int = int(
+        os.getenv("PROFILING_TRACEMALLOC_FRAMES", "1")
+    )
+    # Key required in the X-Admin-Key header of admin endpoints (empty disables them)
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
+
+    # Logging (LOG_FORMAT "json" or "text"; LOG_LEVELS format:
+    # "app.services.transcription_service=DEBUG,httpx=WARNING")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_FILE: str = os.getenv("LOG_FILE", "app.log")
+    LOG_FILE_MAX_BYTES: int = int(
+        os.getenv("LOG_FILE_MAX_BYTES", str(10 * 1024 * 1024))
+    )
+    LOG_FILE_BACKUP_COUNT: int = int(os.getenv("LOG_FILE_BACKUP_COUNT", "5"))
+    # Longer messages and field values are cut to this many characters
+    LOG_MAX_FIELD_CHARS: int = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+
+    # Audio extraction backend: "ffmpeg", or "moviepy" (optional dependency,
+    # see requirements-moviepy.txt)
+    AUDIO_EXTRACTION_BACKEND: str = os.getenv("AUDIO_EXTRACTION_BACKEND", "ffmpeg")
+
+    # Local frame-sampling pre-analysis (face presence and motion) with
+    # OpenCV, an optional dependency (see requirements-vision.txt)
+    FRAME_ANALYSIS_ENABLED: bool = (
+        os.getenv("FRAME_ANALYSIS_ENABLED", "false").lower() == "true"
+    )
+    FRAME_SAMPLE_FPS: float = float(os.getenv("FRAME_SAMPLE_FPS", "1"))
+    # Frames are downscaled to this width before detection
+    FRAME_ANALYSIS_MAX_WIDTH: int = int(os.getenv("FRAME_ANALYSIS_MAX_WIDTH", "320"))
+    FRAME_ANALYSIS_SEGMENT_SECONDS: float = float(
+        os.getenv("FRAME_ANALYSIS_SEGMENT_SECONDS", "60")
+    )
+    FRAME_ANALYSIS_WINDOW_SECONDS: float = float(
+        os.getenv("FRAME_ANALYSIS_WINDOW_SECONDS", "10")
+    )
+    # Also give the frame statistics (without the time series) to the scoring prompt
+    FRAME_ANALYSIS_IN_PROMPT: bool = (
+        os.getenv("FRAME_ANALYSIS_IN_PROMPT", "false").lower() == "true"
+    )
+
+    # SQLite full-text index of transcript turns behind /search. The default
+    # tokenizer splits on spaces; "trigram" also matches inside words, for
+    # languages written without spaces such as Thai
+    TRANSCRIPT_INDEX_ENABLED: bool = (
+        os.getenv("TRANSCRIPT_INDEX_ENABLED", "true").lower() == "true"
+    )
+    TRANSCRIPT_INDEX_PATH: str = os.getenv(
+        "TRANSCRIPT_INDEX_PATH", str(BASE_DIR / "transcript_index.db")
+    )
+    TRANSCRIPT_INDEX_TOKENIZER: str = os.getenv(
+        "TRANSCRIPT_INDEX_TOKENIZER", "unicode61 remove_diacritics 2 tokenchars '+#'"
+    )
+
+    # Process pool for CPU-bound stages (0 sizes it from the CPU quota, leaving
+    # a core for the API); workers are started at startup when a stage needs them
+    CPU_POOL_WORKERS: int = int(os.getenv("CPU_POOL_WORKERS", "0"))
+    CPU_POOL_PREWARM: bool = os.getenv("CPU_POOL_PREWARM", "true").lower() == "true"
+
+    # Storage lifecycle (retention in hours, 0 keeps files forever)
+    VIDEO_RETENTION_HOURS: float = float(os.getenv("VIDEO_RETENTION_HOURS", "168"))
+    AUDIO_RETENTION_HOURS: float = float(os.getenv("AUDIO_RETENTION_HOURS", "24"))
+    RESULTS_RETENTION_HOURS: float = float(
+        os.getenv("RESULTS_RETENTION_HOURS", "720")
+    )
+    STORAGE_SWEEP_INTERVAL_SECONDS: float = float(
+        os.getenv("STORAGE_SWEEP_INTERVAL_SECONDS", "3600")
+    )
+    # Uploads are refused (HTTP 507) when they would leave less free space
+    STORAGE_MIN_FREE_MB: int = int(os.getenv("STORAGE_MIN_FREE_MB", "200"))
+    DELETE_INTERMEDIATE_AUDIO: bool = (
+        os.getenv("DELETE_INTERMEDIATE_AUDIO", "true").lower() == "true"
+    )
+
+    # Artifact storage: "local" directories, or an S3-compatible bucket
+    # ("s3", optional dependency, see requirements-s3.txt)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_PREFIX: str = os.getenv("S3_PREFIX", "")
+    # Custom endpoint for MinIO and other S3-compatible stores
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
+    S3_REGION: str = os.getenv("S3_REGION", "")
+    S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID", "")
+    S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+    S3_MULTIPART_CHUNK_MB: int = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8"))
+    PRESIGNED_URL_EXPIRY_SECONDS: int = int(
+        os.getenv("PRESIGNED_URL_EXPIRY_SECONDS", "3600")
+    )
+    # Local copies of remote videos for ffmpeg and provider uploads
+    SCRATCH_CACHE_MAX_MB: int = int(os.getenv("SCRATCH_CACHE_MAX_MB", "2048"))
+
+    # Results are stored as compressed JSON (zstd level, or gzip without
+    # zstandard); decoded results of this many jobs are cached in memory
+    RESULT_COMPRESSION_LEVEL: int = int(os.getenv("RESULT_COMPRESSION_LEVEL", "3"))
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "64"))
+
+    # Serialized, pre-compressed bodies of completed results kept in memory
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "64")
+    )
+
+    # Provider request timeouts
+    AZURE_REQUEST_TIMEOUT_SECONDS: float = float(
+        os.getenv("AZURE_REQUEST_TIMEOUT_SECONDS", "900")
+    )
+    GEMINI_REQUEST_TIMEOUT_SECONDS: float = float(
+        os.getenv("GEMINI_REQUEST_TIMEOUT_SECONDS", "600")
+    )
+
+    # Per-stage deadlines of the processing pipeline
+    STAGE_TIMEOUT_AUDIO_EXTRACTION_SECONDS: float = float(
+        os.getenv("STAGE_TIMEOUT_AUDIO_EXTRACTION_SECONDS", "1800")
+    )
+    STAGE_TIMEOUT_TRANSCRIPTION_SECONDS: float = float(
+        os.getenv("STAGE_TIMEOUT_TRANSCRIPTION_SECONDS", "1800")
+    )
+    STAGE_TIMEOUT_BODY_LANGUAGE_SECONDS: float = float(
+        os.getenv("STAGE_TIMEOUT_BODY_LANGUAGE_SECONDS", "1800")
+    )
+    STAGE_TIMEOUT_SCORING_SECONDS: float = float(
+        os.getenv("STAGE_TIMEOUT_SCORING_SECONDS", "900")
+    )
+    STAGE_TIMEOUT_FRAME_ANALYSIS_SECONDS: float = float(
+        os.getenv("STAGE_TIMEOUT_FRAME_ANALYSIS_SECONDS", "900")
+    )
+
+    # Gemini cached-content settings for the static prompt prefixes
+    GEMINI_PROMPT_CACHE_ENABLED: bool = (
+        os.getenv("GEMINI_PROMPT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    GEMINI_PROMPT_CACHE_TTL_SECONDS: int = int(
+        os.getenv("GEMINI_PROMPT_CACHE_TTL_SECONDS", "3600")
+    )
+    # Smallest prefix worth registering (estimated tokens, 0 uses the model's
+    # documented minimum)
+    GEMINI_PROMPT_CACHE_MIN_TOKENS: int = int(
+        os.getenv("GEMINI_PROMPT_CACHE_MIN_TOKENS", "0")
+    )
+
+    # Prompt compaction settings (estimated tokens, 0 disables summarization)
+    PROMPT_TRANSCRIPT_TOKEN_BUDGET: int = int(
+        os.getenv("PROMPT_TRANSCRIPT_TOKEN_BUDGET", "30000")
+    )
+
+    # Batched scoring settings (several candidates per Gemini request)
+    SCORING_BATCH_ENABLED: bool = (
+        os.getenv("SCORING_BATCH_ENABLED", "false").lower() == "true"
+    )
+    SCORING_BATCH_SIZE: int = int(os.getenv("SCORING_BATCH_SIZE", "5"))
+    SCORING_BATCH_MAX_WAIT_SECONDS: float = float(
+        os.getenv("SCORING_BATCH_MAX_WAIT_SECONDS", "60")
+    )
 
     # File paths
     UPLOAD_DIR: Path = BASE_DIR / "uploads"
     VIDEO_UPLOAD_DIR: Path = UPLOAD_DIR / "videos"
     AUDIO_UPLOAD_DIR: Path = UPLOAD_DIR / "audio"
     RESULTS_DIR: Path = BASE_DIR / "results"
+    SCRATCH_DIR: Path = BASE_DIR / "scratch"
+
+    @field_validator("SCRATCH_DIR", mode="before")
+    @classmethod
+    def default_empty_scratch_dir(cls, value):
+        # An empty value means unset; Path("") would be the working directory
+        return value or BASE_DIR / "scratch"
 
     # File size limits
     MAX_UPLOAD_SIZE_MB: int = 1024 * 1024 * 500
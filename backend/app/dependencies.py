@@ -0,0 +1,18 @@
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """
+    Allow the request only with the configured ``X-Admin-Key``.
+
+    Admin endpoints are disabled while ADMIN_API_KEY is empty.
+    """
+    if not settings.ADMIN_API_KEY or not x_admin_key:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Admin access required")
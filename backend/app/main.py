@@ -1,28 +1,47 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import uvicorn
 
 from app.config import settings
-from app.routers import analysis
+from app.routers import admin, analysis
+from app.services.analysis_service import scoring_batcher
+from app.services.cpu_pool import cpu_pool
+from app.services.storage_lifecycle import storage_lifecycle
+from app.utils.logging_setup import setup_logging
+from app.utils.metrics import BYTES_SERVED
+from app.utils.tracing import setup_tracing
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
 
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("app.log")],
-)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
+setup_tracing()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Enforce storage retention in the background while the API runs
+    storage_lifecycle.start()
+    cpu_pool.start()
+    yield
+    await scoring_batcher.shutdown()
+    await storage_lifecycle.stop()
+    cpu_pool.shutdown()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     description="API for analyzing interview videos",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -37,7 +56,19 @@ class LimitUploadSize(BaseHTTPMiddleware):
         return await call_next(request)
 
 
+class CountBytesServed(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        content_length = response.headers.get("content-length")
+        route = request.scope.get("route")
+        if content_length and route is not None:
+            # Label by route template so job IDs don't explode the series count
+            BYTES_SERVED.labels(route.path).inc(int(content_length))
+        return response
+
+
 app.add_middleware(LimitUploadSize)
+app.add_middleware(CountBytesServed)
 
 # Add CORS middleware
 app.add_middleware(
@@ -50,6 +81,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(analysis.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -62,5 +94,10 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,28 +1,52 @@
+import asyncio
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 import uuid
-from ..schemas.analysis import ProcessingStatus
+from ..schemas.analysis import JobPriority, ProcessingStatus
 
 
 class AnalysisJob:
     """In-memory storage for job tracking"""
 
-    def __init__(self, filename: str):
+    def __init__(
+        self,
+        filename: str,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        tenant: str = "default",
+    ):
         self.job_id: str = str(uuid.uuid4())
         self.filename: str = filename
         self.original_filename: str = filename
         self.status: ProcessingStatus = ProcessingStatus.PENDING
+        self.priority: JobPriority = priority
+        self.tenant: str = tenant
         self.created_at: datetime = datetime.now()
         self.updated_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
+        # Storage key of the uploaded video, and a local path to it while
+        # the pipeline runs (the same file with the local storage backend)
+        self.video_key: Optional[str] = None
         self.video_path: Optional[str] = None
         self.audio_path: Optional[str] = None
-        self.transcript: Optional[str] = None
         self.transcript_json_path: Optional[str] = None
-        self.analysis_result: Optional[Dict[str, Any]] = None
+        # Storage key of the compressed transcript and analysis result; the
+        # content is loaded on demand through the result cache
+        self.result_key: Optional[str] = None
+        self.token_usage: Dict[str, Dict[str, int]] = {}
+        # Start/end and resource usage of each stage, keyed by stage name
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        # Propagated trace context of the upload request, if tracing is enabled
+        self.trace_context: Dict[str, str] = {}
         self.current_step: Optional[str] = None
         self.progress: float = 0.0
         self.error: Optional[str] = None
+        self.content_hash: Optional[str] = None
+        self.inflight_key: Optional[str] = None
+        # Set when this job shares the pipeline of an identical running job
+        self.leader_job_id: Optional[str] = None
+        self.followers: List["AnalysisJob"] = []
+        # Background task running this job's pipeline
+        self.task: Optional[asyncio.Task] = None
 
     def update_status(
         self,
@@ -30,28 +54,72 @@ class AnalysisJob:
         step: Optional[str] = None,
         error: Optional[str] = None,
     ):
-        self.status = status
-        if step:
-            self.current_step = step
-        if error:
-            self.error = error
-        self.updated_at = datetime.now()
-        if status == ProcessingStatus.COMPLETED:
-            self.completed_at = datetime.now()
-            self.progress = 1.0
+        # A cancelled job keeps its status even if a shared pipeline runs on
+        if self.status != ProcessingStatus.CANCELLED:
+            self.status = status
+            if step:
+                self.current_step = step
+            if error:
+                self.error = error
+            self.updated_at = datetime.now()
+            if status == ProcessingStatus.COMPLETED:
+                self.completed_at = datetime.now()
+                self.progress = 1.0
+
+        for follower in self.followers:
+            if status == ProcessingStatus.COMPLETED:
+                follower.copy_results_from(self)
+            follower.update_status(status, step, error)
 
     def update_progress(self, progress: float):
-        self.progress = progress
+        if self.status != ProcessingStatus.CANCELLED:
+            self.progress = progress
+            self.updated_at = datetime.now()
+
+        for follower in self.followers:
+            follower.update_progress(progress)
+
+    def start_timing(self, stage: str):
+        self.timings[stage] = {"started_at": datetime.now()}
+        for follower in self.followers:
+            follower.timings[stage] = self.timings[stage]
+
+    def finish_timing(self, stage: str, usage: Optional[Dict[str, float]] = None):
+        timing = self.timings.get(stage)
+        if timing is None:
+            return
+        timing["finished_at"] = datetime.now()
+        timing["duration_seconds"] = round(
+            (timing["finished_at"] - timing["started_at"]).total_seconds(), 3
+        )
+        timing.update({key: round(value, 3) for key, value in (usage or {}).items()})
+
+    def mark_cancelled(self):
+        """Cancel this job only; followers sharing its pipeline are unaffected"""
+        self.status = ProcessingStatus.CANCELLED
+        self.current_step = "Cancelled"
         self.updated_at = datetime.now()
 
+    def copy_results_from(self, leader: "AnalysisJob"):
+        """Take over the outputs of the job whose pipeline this job shared"""
+        self.audio_path = leader.audio_path
+        self.transcript_json_path = leader.transcript_json_path
+        self.result_key = leader.result_key
+        self.token_usage = dict(leader.token_usage)
+
 
 # Simple in-memory database to store analysis jobs
 class AnalysisJobDB:
     def __init__(self):
         self.jobs: Dict[str, AnalysisJob] = {}
 
-    def create_job(self, filename: str) -> AnalysisJob:
-        job = AnalysisJob(filename)
+    def create_job(
+        self,
+        filename: str,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        tenant: str = "default",
+    ) -> AnalysisJob:
+        job = AnalysisJob(filename, priority, tenant)
         self.jobs[job.job_id] = job
         return job
 
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+import os
+from typing import Any, Dict, List
+
+from app.config import settings
+from app.dependencies import require_admin
+from app.utils.profiling import folded_profile_path, job_profiles, profile_path
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+PROFILE_SUFFIX = "_profile.json"
+
+
+@router.get("/profiles")
+async def list_profiles() -> Dict[str, List[Any]]:
+    """
+    List written job profiles and the jobs still being profiled.
+    """
+    written = []
+    for name in sorted(os.listdir(settings.RESULTS_DIR)):
+        if name.endswith(PROFILE_SUFFIX):
+            path = os.path.join(settings.RESULTS_DIR, name)
+            written.append(
+                {
+                    "job_id": name[: -len(PROFILE_SUFFIX)],
+                    "size_bytes": os.path.getsize(path),
+                    "modified_at": os.path.getmtime(path),
+                }
+            )
+    return {"profiles": written, "in_progress": sorted(job_profiles.profiles)}
+
+
+@router.get("/profiles/{job_id}")
+async def get_profile(
+    job_id: str, format: str = Query("json", pattern="^(json|folded)$")
+):
+    """
+    Download a job profile: the JSON summary, or the folded stacks that
+    flamegraph tools (flamegraph.pl, speedscope) read.
+    """
+    if format == "folded":
+        path = folded_profile_path(settings.RESULTS_DIR, job_id)
+        media_type = "text/plain"
+    else:
+        path = profile_path(settings.RESULTS_DIR, job_id)
+        media_type = "application/json"
+
+    # Job ids are generated UUIDs; reject anything that escapes the directory
+    if os.path.dirname(os.path.abspath(path)) != os.path.abspath(settings.RESULTS_DIR):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not os.path.exists(path):
+        if job_profiles.get(job_id):
+            raise HTTPException(status_code=409, detail="Job is still being profiled")
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
@@ -1,15 +1,17 @@
 from fastapi import (
     APIRouter,
+    Request,
     UploadFile,
     File,
     BackgroundTasks,
     HTTPException,
     Depends,
     Form,
+    Header,
     Body,
     Query,
 )
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, RedirectResponse
 import os
 from typing import Optional, List
 import asyncio
@@ -20,45 +22,154 @@ import json
 from app.schemas.analysis import (
     VideoUploadResponse,
     AnalysisResponse,
+    JobPriority,
     JobStatusResponse,
+    TranscriptSearchResponse,
 )
-from app.models.analysis import job_db, ProcessingStatus
-from app.services.analysis_service import process_video_job
-from app.utils.file_utils import save_uploaded_file, is_video_file
+from app.models.analysis import AnalysisJob, job_db, ProcessingStatus
+from app.services.analysis_service import (
+    cancel_video_job,
+    job_scheduler,
+    pipeline_config_key,
+)
+from app.services.inflight import inflight_jobs
+from app.services.object_storage import storage, storage_key
+from app.services.result_store import result_cache, results_bodies
+from app.services.storage_lifecycle import (
+    InsufficientStorage,
+    check_free_space,
+    storage_lifecycle,
+)
+from app.services.transcript_index import transcript_index
+from app.utils.file_utils import save_upload_to_storage, is_video_file
+from app.utils.logging_setup import job_id_var
+from app.utils.metrics import BYTES_UPLOADED, stage_timer
+from app.utils.responses import (
+    FastJSONResponse,
+    dump_json,
+    encoded_response,
+    etag_for,
+    etag_matches,
+    json_response,
+    not_modified,
+)
+from app.utils.profiling import active_profile, job_profiles
+from app.utils.tracing import inject_context, start_span
 from app.config import settings
 
-router = APIRouter(prefix="/api/v1", tags=["analysis"])
+router = APIRouter(
+    prefix="/api/v1", tags=["analysis"], default_response_class=FastJSONResponse
+)
 logger = logging.getLogger(__name__)
 
+# Completed results never change, so their encoded bodies can be reused
+RESULTS_CACHE_CONTROL = "private, max-age=3600"
+
+
+def job_status_response(job: AnalysisJob) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.job_id,
+        status=job.status,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        filename=job.original_filename,
+        priority=job.priority,
+        tenant=job.tenant,
+        current_step=job.current_step,
+        progress=job.progress,
+        timings=job.timings,
+        error=job.error,
+    )
+
 
 @router.post("/upload", response_model=VideoUploadResponse)
 async def upload_video(
+    request: Request,
     file: UploadFile = File(...),
+    priority: JobPriority = Form(JobPriority.INTERACTIVE),
+    tenant: str = Form("default"),
+    profile: bool = Form(False),
+    x_profile: bool = Header(False),
 ):
     """
     Upload a video file for analysis.
+
+    Interactive jobs are scheduled ahead of batch jobs; jobs of the same
+    priority are shared fairly between tenants. When profiling is enabled,
+    ``profile=true`` or an ``X-Profile: true`` header records a profile of
+    the job, readable through the admin API.
+
+    Uploads are refused with 507 when the volume is nearly full.
     """
+    job_profile = None
     try:
         logger.info(f"Uploading video: {file.filename}")
         # Validate video file
         if not is_video_file(file.filename):
             raise HTTPException(status_code=400, detail="Not a valid video file")
 
+        # Refuse the upload rather than fill the volume the pipeline writes to
+        try:
+            check_free_space(int(request.headers.get("content-length") or 0))
+        except InsufficientStorage as e:
+            logger.warning(f"Refusing upload of {file.filename}: {str(e)}")
+            storage_lifecycle.request_sweep()
+            raise HTTPException(status_code=507, detail=str(e))
+
         # Create a new job
-        job = job_db.create_job(file.filename)
+        job = job_db.create_job(file.filename, priority, tenant)
+        # Each request runs in its own context, so this tags only its records
+        job_id_var.set(job.job_id)
 
         # Generate a unique filename
         file_extension = os.path.splitext(file.filename)[1]
-        video_filename = f"{job.job_id}{file_extension}"
+        video_key = storage_key("videos", f"{job.job_id}{file_extension}")
+
+        if settings.PROFILING_ENABLED and (profile or x_profile):
+            job_profile = job_profiles.start(job.job_id)
 
         # Save the uploaded file
-        video_path = await save_uploaded_file(
-            file, settings.VIDEO_UPLOAD_DIR, video_filename
-        )
-        job.video_path = video_path
+        job.start_timing("upload_write")
+        profile_token = active_profile.set(job_profile)
+        try:
+            with stage_timer("upload_write"), start_span(
+                "upload_video",
+                job_id=job.job_id,
+                tenant=tenant,
+                priority=priority.value,
+            ) as span:
+                file_size, content_hash = await save_upload_to_storage(
+                    file, video_key
+                )
+                span.set_attribute("bytes", file_size)
+                # The pipeline runs after this request returns; let it join the trace
+                job.trace_context = inject_context()
+        finally:
+            active_profile.reset(profile_token)
+        BYTES_UPLOADED.labels("server").inc(file_size)
+        job.finish_timing("upload_write", {"bytes_written": file_size})
+        job.video_key = video_key
+        job.content_hash = content_hash
 
-        # Launch truly asynchronous background processing task
-        asyncio.create_task(process_video_job(job.job_id))
+        # Share the pipeline of an identical video that is still processing
+        leader = inflight_jobs.attach(pipeline_config_key(content_hash), job)
+        if leader:
+            storage.delete(video_key)
+            job.video_key = leader.video_key
+            # An urgent duplicate should not wait behind the leader's batch slot
+            job_scheduler.promote(leader, priority)
+            # The leader's pipeline is profiled (or not) under its own job
+            await asyncio.to_thread(
+                job_profiles.finish, job.job_id, settings.RESULTS_DIR
+            )
+            message = (
+                "Video uploaded successfully. An identical video is already "
+                "being processed; this job will receive the same results."
+            )
+        else:
+            # Queue the job; the scheduler starts it when a slot is free
+            job_scheduler.submit(job)
+            message = "Video uploaded successfully. Processing has been queued."
 
         logger.info(f"Video uploaded successfully: {job.job_id}")
 
@@ -66,12 +177,19 @@ async def upload_video(
             job_id=job.job_id,
             filename=file.filename,
             status=job.status,
-            message="Video uploaded successfully. Processing has been started.",
+            message=message,
             created_at=job.created_at,
         )
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         logger.error(f"Error uploading video: {str(e)}")
+        if job_profile:
+            await asyncio.to_thread(
+                job_profiles.finish, job_profile.job_id, settings.RESULTS_DIR
+            )
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -84,43 +202,75 @@ async def get_job_status(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return JobStatusResponse(
-        job_id=job.job_id,
-        status=job.status,
-        created_at=job.created_at,
-        updated_at=job.updated_at,
-        filename=job.original_filename,
-        current_step=job.current_step,
-        progress=job.progress,
-        error=job.error,
-    )
+    return job_status_response(job)
 
 
 @router.get("/jobs", response_model=List[JobStatusResponse])
-async def list_jobs():
+async def list_jobs(request: Request):
     """
     List all jobs.
+
+    The body is compressed when the client accepts it, and an unchanged
+    list answers a matching If-None-Match with 304.
     """
     jobs = job_db.list_jobs()
-    return [
-        JobStatusResponse(
-            job_id=job.job_id,
-            status=job.status,
-            created_at=job.created_at,
-            updated_at=job.updated_at,
-            filename=job.original_filename,
-            current_step=job.current_step,
-            progress=job.progress,
-            error=job.error,
+    return json_response(request, [job_status_response(job) for job in jobs])
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a pending or running job.
+    """
+    job = job_db.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status in (
+        ProcessingStatus.COMPLETED,
+        ProcessingStatus.FAILED,
+        ProcessingStatus.CANCELLED,
+    ):
+        raise HTTPException(
+            status_code=409, detail=f"Job is already {job.status.value}"
         )
-        for job in jobs
-    ]
+
+    cancel_video_job(job)
+    return job_status_response(job)
+
+
+@router.get("/search", response_model=TranscriptSearchResponse)
+async def search_transcripts(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Search the transcripts of all jobs.
+
+    Terms must all appear in a turn unless joined with OR; "term*" matches a
+    prefix. Jobs are ranked by their best matching turn, and each lists its
+    best matching turns with speaker, time and a highlighted snippet.
+    """
+    if not settings.TRANSCRIPT_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="Transcript search is disabled")
+
+    try:
+        results = await asyncio.to_thread(transcript_index.search, q, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return TranscriptSearchResponse(query=q, results=results)
 
 
 @router.get("/results/{job_id}", response_model=AnalysisResponse)
-async def get_job_results(job_id: str):
+async def get_job_results(job_id: str, request: Request):
     """
     Get the results of a completed job.
+
+    Results are read from compressed storage on demand. The serialized and
+    compressed response bodies are cached in a bounded LRU, and a matching
+    If-None-Match is answered with 304 without loading anything.
     """
     job = job_db.get_job(job_id)
     if not job:
@@ -129,37 +279,62 @@ async def get_job_results(job_id: str):
     if job.status == ProcessingStatus.FAILED:
         raise HTTPException(status_code=400, detail=f"Job failed: {job.error}")
 
+    if job.status == ProcessingStatus.CANCELLED:
+        raise HTTPException(status_code=400, detail="Job was cancelled")
+
     if job.status != ProcessingStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Job is not completed yet")
 
-    return AnalysisResponse(
-        job_id=job.job_id,
-        status=job.status,
-        created_at=job.created_at,
-        completed_at=job.completed_at,
-        filename=job.original_filename,
-        transcript=job.transcript,
-        analysis_result=job.analysis_result,
-        error=job.error,
-    )
+    # Retention removed the stored result
+    result_key = job.result_key
+    if not result_key:
+        raise HTTPException(status_code=410, detail="Job results have expired")
+
+    etag = etag_for(f"{job.job_id}:{result_key}".encode())
+    if etag_matches(request, etag):
+        return not_modified(etag, RESULTS_CACHE_CONTROL)
+
+    def build_body() -> bytes:
+        result = result_cache.get(result_key)
+        return dump_json(
+            AnalysisResponse(
+                job_id=job.job_id,
+                status=job.status,
+                created_at=job.created_at,
+                completed_at=job.completed_at,
+                filename=job.original_filename,
+                transcript=result["transcript"],
+                analysis_result=result["analysis_result"],
+                token_usage=job.token_usage,
+                timings=job.timings,
+                error=job.error,
+            )
+        )
+
+    try:
+        encoded = await asyncio.to_thread(
+            results_bodies.get, etag, build_body, job.job_id
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Job results have expired")
+
+    return encoded_response(request, encoded, RESULTS_CACHE_CONTROL)
 
 
 @router.get("/videos/{job_id}")
 async def get_video(job_id: str):
     """
     Get the uploaded video file with proper range support.
+
+    With object storage the client is redirected to a presigned URL, so the
+    video bytes never pass through the API.
     """
     job = job_db.get_job(job_id)
-    if not job or not job.video_path:
+    if not job or not job.video_key:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    # Check if the file exists on disk
-    if not os.path.exists(job.video_path):
-        raise HTTPException(status_code=404, detail="Video file not found on disk")
-
-    # Get file extension and size
-    file_extension = os.path.splitext(job.video_path)[1].lower()
-    file_size = os.path.getsize(job.video_path)
+    # Get file extension
+    file_extension = os.path.splitext(job.video_key)[1].lower()
 
     # Determine proper MIME type
     content_type = "video/mp4"  # Default
@@ -170,7 +345,16 @@ async def get_video(job_id: str):
     elif file_extension == ".webm":
         content_type = "video/webm"
 
+    url = storage.presigned_url(job.video_key, job.original_filename, content_type)
+    if url:
+        return RedirectResponse(url, status_code=307)
+
+    # Check if the file exists on disk
+    video_path = storage.fetch(job.video_key)
+    if not os.path.exists(video_path):
+        raise HTTPException(status_code=404, detail="Video file not found on disk")
+
     # Use simpler FileResponse which handles ranges automatically
     return FileResponse(
-        job.video_path, media_type=content_type, filename=job.original_filename
+        video_path, media_type=content_type, filename=job.original_filename
     )
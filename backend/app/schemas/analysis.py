@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, model_validator, validator
 from typing import Optional, Dict, List, Any, Union
 from datetime import datetime
 from enum import Enum
@@ -9,6 +9,12 @@ class ProcessingStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
 
 
 class VideoUploadResponse(BaseModel):
@@ -31,6 +37,18 @@ class AnalysisRequest(BaseModel):
     job_id: str
 
 
+class StageTiming(BaseModel):
+    """Wall-clock span and resource usage of one processing stage"""
+
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    bytes_uploaded: Optional[int] = None
+
+
 class AnalysisResponse(BaseModel):
     job_id: str
     status: ProcessingStatus
@@ -39,15 +57,84 @@ class AnalysisResponse(BaseModel):
     filename: str
     transcript: Optional[str] = None
     analysis_result: Optional[Dict[str, Any]] = None
+    token_usage: Optional[Dict[str, Dict[str, int]]] = None
+    timings: Optional[Dict[str, StageTiming]] = None
     error: Optional[str] = None
 
 
+class TranscriptSearchHit(BaseModel):
+    speaker_id: Optional[int] = None
+    start_time_ms: int
+    end_time_ms: int
+    start_time: Optional[str] = None
+    snippet: str
+
+
+class TranscriptSearchResult(BaseModel):
+    job_id: str
+    filename: Optional[str] = None
+    score: float
+    hit_count: int
+    hits: List[TranscriptSearchHit]
+
+
+class TranscriptSearchResponse(BaseModel):
+    query: str
+    results: List[TranscriptSearchResult]
+
+
 class JobStatusResponse(BaseModel):
     job_id: str
     status: ProcessingStatus
     created_at: datetime
     updated_at: Optional[datetime] = None
     filename: str
+    priority: JobPriority = JobPriority.INTERACTIVE
+    tenant: str = "default"
     current_step: Optional[str] = None
     progress: Optional[float] = None
+    timings: Optional[Dict[str, StageTiming]] = None
     error: Optional[str] = None
+
+
+class BodyLanguageReport(BaseModel):
+    """Structured Gemini output of the body language analysis"""
+
+    verbal_communication: str
+    non_verbal_communication_and_body_language: str
+    emotional_and_vocal_tone_analysis: str
+
+
+class ScoreItem(BaseModel):
+    reason: str
+    score: float = Field(ge=0, le=10)
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_reason_score_pair(cls, value: Any) -> Any:
+        # Accept the ["Reason for the score", 0-10] form used in the prompts
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            return {"reason": value[0], "score": value[1]}
+        return value
+
+
+class CandidateScore(BaseModel):
+    """Structured Gemini output of the candidate scoring"""
+
+    verbal_communication_score: ScoreItem
+    non_verbal_communication_and_body_language_score: ScoreItem
+    emotional_and_vocal_tone_analysis_score: ScoreItem
+    skills_experience_professional_competence_score: ScoreItem
+    motivation_adaptability_professional_attitude_score: ScoreItem
+
+    def to_result(self) -> Dict[str, List[Union[str, float]]]:
+        """Return the scores as {criterion: [reason, score]} pairs"""
+        return {
+            name: [getattr(self, name).reason, getattr(self, name).score]
+            for name in type(self).model_fields
+            if name.endswith("_score")
+        }
+
+
+class BatchCandidateScore(CandidateScore):
+    candidate_id: str
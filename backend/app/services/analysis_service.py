@@ -1,24 +1,60 @@
 import os
 import json
-import time
-import pathlib
+import contextvars
 import re
+import time
 import logging
-from typing import Dict, Any, Optional
-from google import genai
-from google.genai import types
+from functools import lru_cache, partial
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
 from app.config import settings
-from app.models.analysis import job_db, ProcessingStatus
-from app.services.audio_service import (
-    extract_audio_from_video,
-    extract_audio_from_video_with_ffmpeg,
+from app.models.analysis import AnalysisJob, job_db, ProcessingStatus
+from app.schemas.analysis import (
+    BatchCandidateScore,
+    BodyLanguageReport,
+    CandidateScore,
 )
+from app.services.audio_service import audio_extractor
+from app.services.frame_analysis import analyze_frames
 from app.services.transcription_service import transcribe_audio_with_diarization
+from app.services.scoring_batcher import ScoringBatcher
+from app.services.prompt_cache import prompt_cache, prompt_version_hash
+from app.services.gemini_client import create_gemini_client, uploaded_file_content
+from app.services.gemini_files import gemini_file_registry
+from app.services.job_control import JobControl, job_controls
+from app.services.object_storage import storage
+from app.services.result_store import (
+    artifact_filename,
+    encode_artifact,
+    publish_artifact,
+)
+from app.services.inflight import inflight_jobs
+from app.services.scheduler import JobScheduler, parse_tenant_weights
+from app.services.rate_limiter import rate_limiter
+from app.services.stage_timing import stage_history
+from app.services.storage_lifecycle import delete_intermediate_audio
+from app.utils.metrics import (
+    IN_FLIGHT_JOBS,
+    JOBS_FINISHED,
+    PROVIDER_TOKENS,
+    QUEUE_DEPTH,
+    provider_call,
+    stage_timer,
+)
+from app.utils.profiling import job_profiles, profile_section
+from app.utils.tracing import start_span
+from app.utils.prompt_compaction import (
+    compact_json,
+    compact_transcript,
+    estimate_tokens,
+)
 from app.utils.prompts import (
     VIDEO_ANALYSIS_SYSTEM_PROMPT,
     VIDEO_ANALYSIS_USER_PROMPT,
     SCORING_SYSTEM_PROMPT,
     SCORING_USER_PROMPT,
+    BATCH_SCORING_USER_PROMPT,
+    BATCH_SCORING_CANDIDATE_TEMPLATE,
     AUDIO_SYSTEM_PROMPT,
     AUDIO_USER_PROMPT,
 )
@@ -29,132 +65,253 @@ logger = logging.getLogger(__name__)
 # Create a thread pool executor
 thread_pool = ThreadPoolExecutor()
 
+# How often a running stage refreshes the job's progress estimate
+PROGRESS_INTERVAL_SECONDS = 1.0
 
-def extract_json_from_markdown(markdown_string: str) -> Dict[str, Any]:
+
+def repair_json_text(text: str) -> str:
     """
-    Extract and parse JSON from a markdown code block string.
+    Cheaply repair common defects in model-generated JSON.
+
+    Strips markdown code fences and any prose around the outermost JSON value,
+    drops trailing commas and unescapes single quotes.
     """
-    # Remove markdown code block indicators and newlines
-    json_string = markdown_string.strip()
-    json_string = re.sub(r"^```json\n", "", json_string)
-    json_string = re.sub(r"\n```$", "", json_string)
+    json_string = text.strip()
+    json_string = re.sub(r"^```[a-zA-Z]*\s*", "", json_string)
+    json_string = re.sub(r"\s*```$", "", json_string)
+
+    # Keep only the outermost JSON object or array
+    starts = [i for i in (json_string.find("{"), json_string.find("[")) if i != -1]
+    if starts:
+        end = max(json_string.rfind("}"), json_string.rfind("]"))
+        json_string = json_string[min(starts) : end + 1]
 
-    # Replace escaped newlines with actual newlines
-    json_string = json_string.replace("\\n", "\n")
+    # Remove trailing commas before closing brackets
+    json_string = re.sub(r",\s*([}\]])", r"\1", json_string)
 
     # Replace escaped quotes with actual quotes
     json_string = json_string.replace("\\'", "'")
 
+    return json_string
+
+
+def extract_json_from_markdown(markdown_string: str) -> Any:
+    """
+    Extract and parse JSON from a markdown code block string.
+    """
+    json_string = repair_json_text(markdown_string)
+
     try:
-        # Parse the JSON string into a Python dictionary
-        json_obj = json.loads(json_string)
-        return json_obj
+        # Allow raw control characters (e.g. newlines) inside strings
+        return json.loads(json_string, strict=False)
     except json.JSONDecodeError as e:
-        logger.error(f"Error parsing JSON from markdown: {str(e)}")
-        logger.error(f"JSON string: {json_string}")
+        logger.error(
+            f"Error parsing JSON from markdown: {str(e)} "
+            f"({len(json_string)} characters)"
+        )
+        logger.debug(f"Unparseable JSON string: {json_string[:1000]}")
         raise Exception(f"Failed to parse analysis result: {str(e)}")
 
 
-def analyze_body_language(video_path: str, transcript: str) -> Dict[str, Any]:
+@lru_cache(maxsize=None)
+def _type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def parse_structured_response(response, schema: Any) -> Any:
     """
-    Analyze body language using Gemini AI.
+    Parse a schema-constrained Gemini response into ``schema``.
+
+    Uses the object already parsed by the SDK when available, then pydantic's
+    validating JSON decoder on the raw text, and only then a local repair pass.
     """
-    # Initialize Gemini client
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
-    model_id = settings.GEMINI_MODEL_ID
+    adapter = _type_adapter(schema)
+
+    if response.parsed is not None:
+        try:
+            return adapter.validate_python(response.parsed)
+        except ValidationError:
+            pass
+
+    text = response.text or ""
+    try:
+        return adapter.validate_json(text)
+    except ValidationError as e:
+        logger.warning(f"Structured response failed validation, repairing: {str(e)}")
 
     try:
-        # Upload the file using the API
-        file_upload = client.files.upload(file=pathlib.Path(video_path))
+        return adapter.validate_python(extract_json_from_markdown(text))
+    except ValidationError as e:
+        logger.error(f"Error validating repaired response: {str(e)}")
+        raise Exception(f"Failed to parse analysis result: {str(e)}")
 
-        # Wait for video to be processed
-        while file_upload.state == "PROCESSING":
-            logger.info("Waiting for video to be processed by Gemini AI.")
-            time.sleep(10)
-            file_upload = client.files.get(name=file_upload.name)
 
-        if file_upload.state == "FAILED":
-            raise ValueError(f"Video processing failed with state: {file_upload.state}")
+def record_token_usage(job_id: Optional[str], stage: str, response) -> None:
+    """
+    Store the provider-reported token usage of a Gemini response on the job.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    job = job_db.get_job(job_id) if job_id else None
+    if usage is None or job is None:
+        return
 
-        logger.info(f"Video processing complete: {file_upload.uri}")
+    job.token_usage[stage] = {
+        "prompt_tokens": usage.prompt_token_count or 0,
+        "cached_tokens": usage.cached_content_token_count or 0,
+        "output_tokens": usage.candidates_token_count or 0,
+    }
+    for kind, count in job.token_usage[stage].items():
+        PROVIDER_TOKENS.labels(stage, kind).inc(count)
+    logger.info(f"Job {job_id} {stage} token usage: {job.token_usage[stage]}")
 
-        # Define system and user prompts
-        system_prompt = VIDEO_ANALYSIS_SYSTEM_PROMPT
 
-        user_prompt = VIDEO_ANALYSIS_USER_PROMPT.format(transcript=transcript)
+def generate_content(
+    client, model_id: str, contents: List[Any], config, job_id: Optional[str] = None
+):
+    """
+    Send a generate_content request once the Gemini rate limits allow it.
 
-        # Send request to Gemini
-        response = client.models.generate_content(
+    For a job's request, the HTTP timeout is capped by the stage deadline and
+    the worker thread stops waiting as soon as the job is cancelled.
+    """
+    from google.genai import types
+
+    # Only text parts can be estimated up front; media tokens are charged once
+    # the provider reports them
+    prompt_tokens = sum(
+        estimate_tokens(part) for part in contents if isinstance(part, str)
+    )
+    control = job_controls.get(job_id) if job_id else None
+    rate_limiter.acquire("gemini_requests", control=control)
+    rate_limiter.acquire("gemini_tokens", prompt_tokens, control=control)
+
+    if control is not None:
+        timeout = control.request_timeout(settings.GEMINI_REQUEST_TIMEOUT_SECONDS)
+        config.http_options = types.HttpOptions(timeout=int(timeout * 1000))
+
+    with stage_timer("gemini_generate"), provider_call("gemini", "generate_content"):
+        with start_span(
+            "gemini.generate_content",
             model=model_id,
-            contents=[
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part.from_uri(
-                            file_uri=file_upload.uri, mime_type=file_upload.mime_type
-                        ),
-                    ],
-                ),
-                user_prompt,
-            ],
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                temperature=0.0,
-            ),
+            estimated_prompt_tokens=prompt_tokens,
+            cached_content=config.cached_content,
+        ) as span:
+            request = partial(
+                client.models.generate_content,
+                model=model_id,
+                contents=contents,
+                config=config,
+            )
+            response = control.call(request) if control is not None else request()
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                span.set_attributes(
+                    {
+                        "prompt_tokens": usage.prompt_token_count or 0,
+                        "cached_tokens": usage.cached_content_token_count or 0,
+                        "output_tokens": usage.candidates_token_count or 0,
+                    }
+                )
+                # Charge what the estimate missed (media, output) to the TPM bucket
+                used_tokens = usage.total_token_count or (
+                    (usage.prompt_token_count or 0)
+                    + (usage.candidates_token_count or 0)
+                )
+                rate_limiter.debit("gemini_tokens", used_tokens - prompt_tokens)
+            return response
+
+
+def _media_content_hash(job_id: Optional[str], media_label: str) -> Optional[str]:
+    """
+    Registry key of a job's media from the hash computed at upload, so the
+    file is not read and hashed again; None when the job has no hash.
+    """
+    job = job_db.get_job(job_id) if job_id else None
+    if job is None or not job.content_hash:
+        return None
+    # The audio is derived from the video, so it is keyed by the video's hash
+    if media_label == "video":
+        return job.content_hash
+    return f"{job.content_hash}:{media_label}"
+
+
+def analyze_body_language(
+    video_path: str, transcript: str, job_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Analyze body language using Gemini AI.
+    """
+    # Initialize Gemini client
+    client = create_gemini_client()
+    model_id = settings.GEMINI_MODEL_ID
+
+    try:
+        # Upload the file, or reuse an earlier upload of the same content
+        file_upload = gemini_file_registry.get_or_upload(
+            client,
+            video_path,
+            job_id=job_id,
+            content_hash=_media_content_hash(job_id, "video"),
+            media_label="video",
         )
 
-        # Extract JSON from response
-        return extract_json_from_markdown(response.text)
+        # Build the request, reusing the cached static prompt prefix
+        contents, config = prompt_cache.build_request(
+            client,
+            model_id,
+            VIDEO_ANALYSIS_SYSTEM_PROMPT,
+            VIDEO_ANALYSIS_USER_PROMPT,
+            media=[uploaded_file_content(file_upload.uri, file_upload.mime_type)],
+            response_schema=BodyLanguageReport,
+            job_id=job_id,
+            transcript=transcript,
+        )
+
+        # Send request to Gemini
+        response = generate_content(client, model_id, contents, config, job_id)
+
+        record_token_usage(job_id, "body_language", response)
+
+        # Parse and validate the structured response
+        report = parse_structured_response(response, BodyLanguageReport)
+        return report.model_dump()
 
     except Exception as e:
         logger.error(f"Error analyzing body language: {str(e)}")
         raise Exception(f"Failed to analyze video: {str(e)}")
 
 
-def analyze_audio(audio_path: str) -> Dict[str, Any]:
+def analyze_audio(audio_path: str, job_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Analyze audio using Gemini AI.
     """
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    client = create_gemini_client()
     model_id = settings.GEMINI_MODEL_ID
 
     try:
-        # Upload the file using the API
-        file_upload = client.files.upload(file=pathlib.Path(audio_path))
-
-        while file_upload.state == "PROCESSING":
-            logger.info("Waiting for audio to be processed by Gemini AI.")
-            time.sleep(10)
-            file_upload = client.files.get(name=file_upload.name)
-
-        if file_upload.state == "FAILED":
-            raise ValueError(f"Audio processing failed with state: {file_upload.state}")
-
-        logger.info(f"Audio processing complete: {file_upload.uri}")
+        # Upload the file, or reuse an earlier upload of the same content
+        file_upload = gemini_file_registry.get_or_upload(
+            client,
+            audio_path,
+            job_id=job_id,
+            content_hash=_media_content_hash(job_id, "audio"),
+            media_label="audio",
+        )
 
-        # Define system and user prompts
-        system_prompt = AUDIO_SYSTEM_PROMPT
-        user_prompt = AUDIO_USER_PROMPT
+        # Build the request, reusing the cached static prompt prefix
+        contents, config = prompt_cache.build_request(
+            client,
+            model_id,
+            AUDIO_SYSTEM_PROMPT,
+            AUDIO_USER_PROMPT,
+            media=[uploaded_file_content(file_upload.uri, file_upload.mime_type)],
+            job_id=job_id,
+        )
 
         # Send request to Gemini
-        response = client.models.generate_content(
-            model=model_id,
-            contents=[
-                types.Content(
-                    role="user",
-                    parts=[
-                        types.Part.from_uri(
-                            file_uri=file_upload.uri, mime_type=file_upload.mime_type
-                        )
-                    ],
-                ),
-                user_prompt,
-            ],
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                temperature=0.0,
-            ),
-        )
+        response = generate_content(client, model_id, contents, config, job_id)
+
+        record_token_usage(job_id, "audio", response)
 
         return response.text
 
@@ -163,42 +320,267 @@ def analyze_audio(audio_path: str) -> Dict[str, Any]:
         raise Exception(f"Failed to analyze audio: {str(e)}")
 
 
-def score_candidate(transcript: str, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+def score_candidate(
+    transcript: str, analysis_result: Dict[str, Any], job_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Score the candidate based on the transcript and analysis result.
     """
     # Initialize Gemini client
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    client = create_gemini_client()
     model_id = settings.GEMINI_MODEL_ID
 
     try:
-        # Define scoring system prompt
-        scoring_system_prompt = SCORING_SYSTEM_PROMPT
-
-        # Define scoring user prompt
-        scoring_user_prompt = SCORING_USER_PROMPT.format(
+        # Build the request, reusing the cached static prompt prefix
+        contents, config = prompt_cache.build_request(
+            client,
+            model_id,
+            SCORING_SYSTEM_PROMPT,
+            SCORING_USER_PROMPT,
+            response_schema=CandidateScore,
+            job_id=job_id,
             transcript=transcript,
-            video_and_audio_analysis_report=json.dumps(analysis_result, indent=2),
+            video_and_audio_analysis_report=compact_json(analysis_result),
         )
 
         # Send request to Gemini
-        response = client.models.generate_content(
-            model=model_id,
-            contents=[scoring_user_prompt],
-            config=types.GenerateContentConfig(
-                system_instruction=scoring_system_prompt,
-                temperature=0.0,
-            ),
-        )
+        response = generate_content(client, model_id, contents, config, job_id)
+        record_token_usage(job_id, "scoring", response)
 
-        # Extract JSON from response
-        return extract_json_from_markdown(response.text)
+        # Parse and validate the structured response
+        score = parse_structured_response(response, CandidateScore)
+        return score.to_result()
 
     except Exception as e:
         logger.error(f"Error scoring candidate: {str(e)}")
         raise Exception(f"Failed to score candidate: {str(e)}")
 
 
+def score_candidates_batch(
+    candidates: List[Tuple[str, str, Dict[str, Any]]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Score several candidates with a single Gemini request.
+
+    Each candidate is a (job_id, transcript, analysis_result) tuple. Returns the
+    scoring result of every candidate found in the response, keyed by job ID.
+    """
+    client = create_gemini_client()
+    model_id = settings.GEMINI_MODEL_ID
+
+    try:
+        candidate_blocks = "\n".join(
+            BATCH_SCORING_CANDIDATE_TEMPLATE.format(
+                candidate_id=job_id,
+                transcript=transcript,
+                video_and_audio_analysis_report=compact_json(analysis_result),
+            )
+            for job_id, transcript, analysis_result in candidates
+        )
+
+        # Send one request for the whole batch
+        contents, config = prompt_cache.build_request(
+            client,
+            model_id,
+            SCORING_SYSTEM_PROMPT,
+            BATCH_SCORING_USER_PROMPT,
+            # The SDK accepts the builtin list[...] form but not typing.List
+            response_schema=list[BatchCandidateScore],
+            candidates=candidate_blocks,
+        )
+        response = generate_content(client, model_id, contents, config)
+        for job_id, _, _ in candidates:
+            record_token_usage(job_id, "scoring_batch", response)
+
+        batch_result = parse_structured_response(response, list[BatchCandidateScore])
+
+        # Demultiplex the scores back onto their jobs
+        job_ids = {job_id for job_id, _, _ in candidates}
+        scores = {}
+        for item in batch_result:
+            if item.candidate_id in job_ids:
+                scores[item.candidate_id] = item.to_result()
+        return scores
+
+    except Exception as e:
+        logger.error(f"Error scoring candidate batch: {str(e)}")
+        raise Exception(f"Failed to score candidate batch: {str(e)}")
+
+
+# Shared batcher used when SCORING_BATCH_ENABLED is set
+scoring_batcher = ScoringBatcher(
+    batch_fn=score_candidates_batch,
+    fallback_fn=score_candidate,
+    executor=thread_pool,
+    max_batch_size=settings.SCORING_BATCH_SIZE,
+    max_wait_seconds=settings.SCORING_BATCH_MAX_WAIT_SECONDS,
+)
+
+
+def pipeline_config_key(content_hash: str) -> str:
+    """
+    Identify a pipeline run by its input content and everything shaping its output.
+    """
+    return prompt_version_hash(
+        content_hash,
+        settings.GEMINI_MODEL_ID,
+        str(settings.PROMPT_TRANSCRIPT_TOKEN_BUDGET),
+        VIDEO_ANALYSIS_SYSTEM_PROMPT,
+        VIDEO_ANALYSIS_USER_PROMPT,
+        SCORING_SYSTEM_PROMPT,
+        SCORING_USER_PROMPT,
+    )
+
+
+def _video_bytes(job: AnalysisJob) -> int:
+    if job.video_path and os.path.exists(job.video_path):
+        return os.path.getsize(job.video_path)
+    return 0
+
+
+def _run_in_worker(control, stage: str, func, *args):
+    started = time.thread_time()
+    try:
+        with profile_section(f"stage.{stage}"):
+            return func(*args)
+    finally:
+        control.record_usage(cpu_seconds=time.thread_time() - started)
+
+
+async def run_stage(job_id: str, stage: str, timeout_seconds: float, func, *args):
+    """
+    Run a blocking pipeline stage in the thread pool under a deadline.
+
+    When the deadline passes the stage's subprocesses and HTTP sessions are
+    aborted, so the worker thread is released instead of pinned. While the
+    stage runs, the job's progress is estimated from how long this stage
+    usually takes, or from the stage's own measurement when it has one.
+    """
+
+    def start(control: JobControl) -> asyncio.Future:
+        # Run in a copy of the current context so spans in the worker
+        # thread are children of this stage
+        context = contextvars.copy_context()
+        return asyncio.get_event_loop().run_in_executor(
+            thread_pool, context.run, _run_in_worker, control, stage, func, *args
+        )
+
+    return await _supervise_stage(job_id, stage, timeout_seconds, start)
+
+
+async def run_async_stage(job_id: str, stage: str, timeout_seconds: float, func, *args):
+    """
+    Await a pipeline stage that runs on the event loop (batched scoring)
+    under the same cancellation, deadline and progress handling as
+    ``run_stage``.
+    """
+
+    def start(control: JobControl) -> asyncio.Future:
+        return asyncio.ensure_future(func(*args))
+
+    return await _supervise_stage(job_id, stage, timeout_seconds, start)
+
+
+async def _supervise_stage(
+    job_id: str,
+    stage: str,
+    timeout_seconds: float,
+    start: Callable[[JobControl], asyncio.Future],
+):
+    job = job_db.get_job(job_id)
+    control = job_controls.get(job_id)
+    control.start_stage(timeout_seconds)
+    job.start_timing(stage)
+    video_bytes = _video_bytes(job)
+    started = time.monotonic()
+    future = None
+
+    try:
+        control.check()
+        with stage_timer(stage), start_span(f"stage.{stage}", job_id=job_id):
+            future = start(control)
+            while True:
+                remaining = started + timeout_seconds - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, _ = await asyncio.wait(
+                    {future}, timeout=min(PROGRESS_INTERVAL_SECONDS, remaining)
+                )
+                if done:
+                    result = future.result()
+                    break
+                job.update_progress(
+                    stage_history.estimate_progress(
+                        stage,
+                        time.monotonic() - started,
+                        video_bytes,
+                        control.stage_progress,
+                    )
+                )
+    except asyncio.TimeoutError:
+        control.abort()
+        future.cancel()
+        raise Exception(f"Stage timed out after {timeout_seconds:.0f} seconds")
+    except BaseException:
+        # Cancelled job: stop waiting work that has not started yet
+        if future is not None:
+            future.cancel()
+        raise
+    finally:
+        job.finish_timing(stage, control.usage)
+
+    stage_history.record(stage, job.timings[stage]["duration_seconds"], video_bytes)
+    job.update_progress(stage_history.estimate_progress(stage, 0, video_bytes, 1.0))
+    return result
+
+
+def _save_results(job_id: str, results: Dict[str, Any]) -> str:
+    # Runs in a worker thread, where the serialization can be profiled
+    with profile_section("json_serialization"):
+        encoded = encode_artifact(results)
+    return publish_artifact(job_id, "results", encoded)
+
+
+def _stop_pipeline(job: AnalysisJob):
+    """
+    Stop the pipeline run by ``job``, whether it is still queued or running.
+    """
+    if job_scheduler.remove(job.job_id):
+        inflight_jobs.release(job)
+        thread_pool.submit(job_profiles.finish, job.job_id, settings.RESULTS_DIR)
+        logger.info(f"Job {job.job_id} cancelled before it started")
+        return
+
+    # Kill ffmpeg, close HTTP sessions and stop the background task
+    job_controls.get(job.job_id).cancel()
+    if job.task and not job.task.done():
+        job.task.cancel()
+    logger.info(f"Job {job.job_id} cancelled")
+
+
+def cancel_video_job(job: AnalysisJob):
+    """
+    Cancel a job and stop its pipeline once no other job is waiting for it.
+    """
+    if job.leader_job_id:
+        # Detach from the pipeline this job was following
+        leader = job_db.get_job(job.leader_job_id)
+        job.mark_cancelled()
+        if not leader or job not in leader.followers:
+            return
+        leader.followers.remove(job)
+        if leader.status == ProcessingStatus.CANCELLED and not leader.followers:
+            # The leader only kept running for its followers
+            _stop_pipeline(leader)
+        return
+
+    job.mark_cancelled()
+    if job.followers:
+        logger.info(f"Job {job.job_id} cancelled; pipeline kept for its followers")
+        return
+    _stop_pipeline(job)
+
+
 async def process_video_job(job_id: str):
     """
     Process a video job asynchronously.
@@ -210,72 +592,175 @@ async def process_video_job(job_id: str):
 
     try:
         # Update job status to processing
+        job.finish_timing("queued")
         job.update_status(ProcessingStatus.PROCESSING, "Starting video processing")
 
+        # ffmpeg and the Gemini upload need the video as a local file
+        job.video_path = await asyncio.get_event_loop().run_in_executor(
+            thread_pool, storage.fetch, job.video_key
+        )
+
         # Step 1: Extract audio from video - Run in thread pool
         job.update_status(ProcessingStatus.PROCESSING, "Extracting audio from video")
-        job.update_progress(0.1)
-        audio_path = await asyncio.get_event_loop().run_in_executor(
-            thread_pool, extract_audio_from_video_with_ffmpeg, job.video_path, job_id
+        audio_path = await run_stage(
+            job_id,
+            "audio_extraction",
+            settings.STAGE_TIMEOUT_AUDIO_EXTRACTION_SECONDS,
+            audio_extractor(),
+            job.video_path,
+            job_id,
         )
-        # audio_path = await asyncio.get_event_loop().run_in_executor(
-        #    thread_pool, extract_audio_from_video, job.video_path, job_id
-        # )
         job.audio_path = audio_path
-        job.update_progress(0.2)
+
+        frame_stats = None
+        if settings.FRAME_ANALYSIS_ENABLED:
+            job.update_status(ProcessingStatus.PROCESSING, "Sampling video frames")
+            frame_stats = await run_stage(
+                job_id,
+                "frame_analysis",
+                settings.STAGE_TIMEOUT_FRAME_ANALYSIS_SECONDS,
+                analyze_frames,
+                job.video_path,
+                job_id,
+            )
 
         # Step 2: Transcribe audio with speaker diarization - Run in thread pool
         job.update_status(ProcessingStatus.PROCESSING, "Transcribing audio")
-        job.update_progress(0.3)
-        transcript = await asyncio.get_event_loop().run_in_executor(
-            thread_pool, transcribe_audio_with_diarization, audio_path, job_id
+        transcript, speaker_stats = await run_stage(
+            job_id,
+            "transcription",
+            settings.STAGE_TIMEOUT_TRANSCRIPTION_SECONDS,
+            transcribe_audio_with_diarization,
+            audio_path,
+            job_id,
         )
-        # transcript = await asyncio.get_event_loop().run_in_executor(
-        #    thread_pool, analyze_audio, audio_path
+        # transcript = await run_stage(
+        #    job_id,
+        #    "transcription",
+        #    settings.STAGE_TIMEOUT_TRANSCRIPTION_SECONDS,
+        #    analyze_audio,
+        #    audio_path,
+        #    job_id,
         # )
-        job.transcript = transcript
-        logger.info(f"Transcript: {transcript}")
+        if settings.DELETE_INTERMEDIATE_AUDIO:
+            # Later stages work from the video and the transcript
+            delete_intermediate_audio(job_id)
+        logger.info(f"Transcript ready: {len(transcript)} characters")
+
+        # Compact the transcript once for both Gemini prompts
+        prompt_transcript, compaction_stats = compact_transcript(
+            transcript,
+            settings.PROMPT_TRANSCRIPT_TOKEN_BUDGET,
+            locale=speaker_stats.get("locale"),
+        )
+        job.token_usage["transcript_compaction"] = compaction_stats
         job.transcript_json_path = os.path.join(
-            settings.RESULTS_DIR, f"{job_id}_transcript.txt"
+            settings.RESULTS_DIR, artifact_filename(job_id, "transcript")
         )
-        job.update_progress(0.5)
 
         # Step 3: Analyze body language - Run in thread pool
         job.update_status(ProcessingStatus.PROCESSING, "Analyzing body language")
-        job.update_progress(0.6)
-        analysis_result = await asyncio.get_event_loop().run_in_executor(
-            thread_pool, analyze_body_language, job.video_path, transcript
+        analysis_result = await run_stage(
+            job_id,
+            "body_language",
+            settings.STAGE_TIMEOUT_BODY_LANGUAGE_SECONDS,
+            analyze_body_language,
+            job.video_path,
+            prompt_transcript,
+            job_id,
         )
-        job.update_progress(0.8)
 
         # Step 4: Score candidate - Run in thread pool
         job.update_status(ProcessingStatus.PROCESSING, "Scoring candidate")
-        job.update_progress(0.9)
-        scoring_result = await asyncio.get_event_loop().run_in_executor(
-            thread_pool, score_candidate, transcript, analysis_result
-        )
+        # The measured talk-time statistics back up what Gemini saw in the media
+        scoring_report = {**analysis_result, "speaker_statistics": speaker_stats}
+        if frame_stats and settings.FRAME_ANALYSIS_IN_PROMPT:
+            scoring_report["frame_statistics"] = {
+                name: value for name, value in frame_stats.items() if name != "series"
+            }
+        if settings.SCORING_BATCH_ENABLED:
+            scoring_result = await run_async_stage(
+                job_id,
+                "scoring",
+                settings.STAGE_TIMEOUT_SCORING_SECONDS,
+                scoring_batcher.score,
+                job_id,
+                prompt_transcript,
+                scoring_report,
+            )
+        else:
+            scoring_result = await run_stage(
+                job_id,
+                "scoring",
+                settings.STAGE_TIMEOUT_SCORING_SECONDS,
+                score_candidate,
+                prompt_transcript,
+                scoring_report,
+                job_id,
+            )
 
         # Combine results
         final_result = {
             "body_language_analysis": analysis_result,
+            "speaker_statistics": speaker_stats,
             "candidate_score": scoring_result,
         }
-        print("#" * 20)
-        print(final_result)
-        print("#" * 20)
-
-        # Save results to a file
-        results_path = os.path.join(settings.RESULTS_DIR, f"{job_id}_results.json")
-        with open(results_path, "w") as f:
-            json.dump(final_result, f, indent=4)
+        if frame_stats:
+            final_result["frame_analysis"] = frame_stats
+        # Save results compressed; the job keeps only a reference to them
+        job.result_key = await asyncio.get_event_loop().run_in_executor(
+            thread_pool,
+            contextvars.copy_context().run,
+            _save_results,
+            job_id,
+            {"transcript": transcript, "analysis_result": final_result},
+        )
 
         # Update job with final result
-        job.analysis_result = final_result
         job.update_status(ProcessingStatus.COMPLETED)
 
         logger.info(f"Job {job_id} completed successfully")
 
+    except asyncio.CancelledError:
+        job.mark_cancelled()
+        raise
+
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Error processing job {job_id}: {error_message}")
-        job.update_status(ProcessingStatus.FAILED, error=error_message)
+        if job_controls.get(job_id).cancelled.is_set():
+            job.mark_cancelled()
+        else:
+            logger.error(f"Error processing job {job_id}: {error_message}")
+            job.update_status(ProcessingStatus.FAILED, error=error_message)
+
+    finally:
+        JOBS_FINISHED.labels(job.status.value).inc()
+        inflight_jobs.release(job)
+        if settings.DELETE_INTERMEDIATE_AUDIO:
+            delete_intermediate_audio(job_id)
+        if job.video_path:
+            storage.release(job.video_key)
+        # A cancelled job frees its Gemini uploads now; finished jobs keep them
+        # for retries and re-scores until they expire or retention removes
+        # the job's results
+        if job.status == ProcessingStatus.CANCELLED:
+            thread_pool.submit(gemini_file_registry.release_job, job_id)
+        job_controls.remove(job_id)
+
+
+def process_video_job_sync(job_id: str):
+    """
+    Process a video job to completion from synchronous code (Celery workers).
+    """
+    asyncio.run(process_video_job(job_id))
+
+
+# Shared scheduler deciding which queued job gets a pipeline slot next
+job_scheduler = JobScheduler(
+    run_job=process_video_job,
+    max_concurrent_jobs=settings.MAX_CONCURRENT_JOBS,
+    tenant_max_concurrent_jobs=settings.TENANT_MAX_CONCURRENT_JOBS,
+    tenant_weights=parse_tenant_weights(settings.TENANT_WEIGHTS),
+)
+QUEUE_DEPTH.set_function(job_scheduler.queued_count)
+IN_FLIGHT_JOBS.set_function(job_scheduler.running_count)
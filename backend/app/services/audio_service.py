@@ -1,7 +1,9 @@
 import os
 from pathlib import Path
-from moviepy import VideoFileClip
+from typing import Callable
 from app.config import settings
+from app.services.cpu_pool import cpu_pool
+from app.services.job_control import job_controls
 import logging
 import subprocess
 
@@ -10,7 +12,10 @@ logger = logging.getLogger(__name__)
 
 def extract_audio_from_video(video_path: str, job_id: str) -> str:
     """
-    Extract audio from video file.
+    Extract audio from video file with moviepy.
+
+    moviepy (with imageio, numpy and Pillow) is an optional dependency,
+    installed from requirements-moviepy.txt and imported on first use.
 
     Parameters:
     -----------
@@ -24,6 +29,14 @@ def extract_audio_from_video(video_path: str, job_id: str) -> str:
     str
         Path to the extracted audio file
     """
+    try:
+        from moviepy import VideoFileClip
+    except ImportError:
+        raise Exception(
+            "Failed to extract audio from video: moviepy is not installed "
+            "(pip install -r requirements-moviepy.txt)"
+        )
+
     try:
         # Generate audio filename
         audio_filename = f"{job_id}_audio.wav"
@@ -64,6 +77,9 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
     str
         Path to the extracted (and possibly compressed) audio file
     """
+    # ffmpeg runs are killed if the job is cancelled or the stage deadline passes
+    control = job_controls.get(job_id)
+
     try:
         # Create output directory if it doesn't exist
         os.makedirs(settings.AUDIO_UPLOAD_DIR, exist_ok=True)
@@ -90,10 +106,13 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
             "-q:a",
             "3",  # Audio quality setting (lower is better, 3 is good)
             "-y",  # Overwrite output file if exists
+            "-progress",
+            "pipe:1",  # Report the position reached for progress tracking
+            "-nostats",
             audio_path,
         ]
         # Run the extraction
-        subprocess.run(extract_command, check=True, capture_output=True, text=True)
+        control.run_command(extract_command, track_progress=True)
         logger.info(f"Initial audio extraction completed: {audio_path}")
 
         # Check file size
@@ -129,7 +148,7 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
             ]
 
             # Try first level of compression
-            subprocess.run(compress_command, check=True, capture_output=True, text=True)
+            control.run_command(compress_command)
             compressed_size = os.path.getsize(compressed_path)
 
             logger.info(
@@ -161,7 +180,7 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
                 ]
 
                 # Run MP3 compression
-                subprocess.run(mp3_command, check=True, capture_output=True, text=True)
+                control.run_command(mp3_command)
                 mp3_size = os.path.getsize(mp3_path)
 
                 logger.info(
@@ -180,9 +199,7 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
                         compressed_path,
                     ]
 
-                    subprocess.run(
-                        final_command, check=True, capture_output=True, text=True
-                    )
+                    control.run_command(final_command)
 
                     # Clean up mp3 temporary file
                     os.remove(mp3_path)
@@ -212,9 +229,7 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
                         "csv=p=0",
                     ]
 
-                    result = subprocess.run(
-                        duration_command, check=True, capture_output=True, text=True
-                    )
+                    result = control.run_command(duration_command)
                     duration = float(result.stdout.strip())
 
                     # Calculate new duration
@@ -235,9 +250,7 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
                         compressed_path,
                     ]
 
-                    subprocess.run(
-                        truncate_command, check=True, capture_output=True, text=True
-                    )
+                    control.run_command(truncate_command)
 
                     # Use the truncated file
                     audio_path = compressed_path
@@ -245,6 +258,10 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
                 # First compression was sufficient
                 audio_path = compressed_path
 
+        control.record_usage(
+            bytes_read=os.path.getsize(video_path),
+            bytes_written=os.path.getsize(audio_path),
+        )
         return audio_path
 
     except subprocess.CalledProcessError as e:
@@ -253,3 +270,30 @@ def extract_audio_from_video_with_ffmpeg(video_path: str, job_id: str) -> str:
     except Exception as e:
         logger.error(f"Error processing audio: {str(e)}")
         raise Exception(f"Failed to process audio: {str(e)}")
+
+
+def extract_audio_from_video_in_worker(video_path: str, job_id: str) -> str:
+    """
+    Run the moviepy extraction in the CPU process pool; its Python-level
+    decoding would otherwise hold the API process's GIL.
+    """
+    return cpu_pool.run(job_id, extract_audio_from_video, video_path, job_id)
+
+
+# Audio extraction backends selectable with AUDIO_EXTRACTION_BACKEND
+AUDIO_EXTRACTORS = {
+    "ffmpeg": extract_audio_from_video_with_ffmpeg,
+    "moviepy": extract_audio_from_video_in_worker,
+}
+
+
+def audio_extractor() -> Callable[[str, str], str]:
+    """
+    Return the configured audio extraction function.
+    """
+    try:
+        return AUDIO_EXTRACTORS[settings.AUDIO_EXTRACTION_BACKEND]
+    except KeyError:
+        raise Exception(
+            f"Unknown audio extraction backend: {settings.AUDIO_EXTRACTION_BACKEND}"
+        )
@@ -0,0 +1,197 @@
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from app.config import settings
+from app.services.job_control import POLL_INTERVAL_SECONDS, job_controls
+from app.utils.logging_setup import job_log_context, setup_worker_logging
+
+logger = logging.getLogger(__name__)
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_CPU_DIRS = ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct")
+
+# A (function, args) call run in a worker process
+CPUTask = Tuple[Callable[..., Any], Sequence[Any]]
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """
+    CPUs the container may use according to its cgroup CPU quota, or None
+    when there is no quota.
+    """
+    cpu_max = _read_first_line(CGROUP_V2_CPU_MAX)
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+
+    for directory in CGROUP_V1_CPU_DIRS:
+        quota = _read_first_line(os.path.join(directory, "cpu.cfs_quota_us"))
+        period = _read_first_line(os.path.join(directory, "cpu.cfs_period_us"))
+        if quota and period and int(quota) > 0:
+            return int(quota) / int(period)
+    return None
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process can actually use: its CPU affinity, capped by the
+    cgroup quota (a container sees every host CPU in ``os.cpu_count``).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(int(limit), 1))
+    return cpus
+
+
+def _init_worker(modules: List[str]):
+    setup_worker_logging()
+    # Pay for heavy imports once per worker instead of on the first task
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _call_in_worker(job_id: str, func: Callable[..., Any], args: Sequence[Any]):
+    started = time.process_time()
+    with job_log_context(job_id):
+        result = func(*args)
+    return result, time.process_time() - started
+
+
+class CPUPool:
+    """
+    Process pool for CPU-bound pipeline work (frame analysis, the moviepy
+    audio backend), so it runs on all cores instead of contending for the
+    API process's GIL.
+
+    Tasks take and return file paths or small summaries; media is never
+    pickled between processes. Workers are spawned, not forked, so they do
+    not inherit the server's threads and sockets, and they pre-import the
+    libraries the enabled stages need.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        if settings.CPU_POOL_WORKERS > 0:
+            return settings.CPU_POOL_WORKERS
+        # Leave a core for the event loop when there is more than one
+        cpus = available_cpus()
+        return cpus - 1 if cpus > 1 else 1
+
+    @staticmethod
+    def warm_modules() -> List[str]:
+        """Modules the enabled CPU-bound stages import."""
+        modules = []
+        if settings.FRAME_ANALYSIS_ENABLED:
+            modules += ["numpy", "cv2", "app.services.frame_analysis"]
+        if settings.AUDIO_EXTRACTION_BACKEND == "moviepy":
+            modules += ["moviepy", "app.services.audio_service"]
+        return modules
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.warm_modules(),),
+                )
+                logger.info(f"Started CPU pool with {self.max_workers} workers")
+            return self._executor
+
+    def start(self):
+        """
+        Spawn and warm up the workers now when a CPU-bound stage is enabled,
+        so the first job does not wait for them.
+        """
+        if not settings.CPU_POOL_PREWARM or not self.warm_modules():
+            return
+        executor = self.executor()
+        for _ in range(self.max_workers):
+            executor.submit(_worker_ready)
+
+    def run_tasks(self, job_id: str, tasks: List[CPUTask]) -> List[Any]:
+        """
+        Run ``tasks`` in worker processes and return their results in order.
+
+        Waits in the calling thread, checking the job's cancellation and
+        stage deadline, and reports the fraction of tasks done as the stage's
+        progress. Tasks that have not started are cancelled if the job stops;
+        a task already running in a worker runs to completion.
+        """
+        control = job_controls.get(job_id)
+        executor = self.executor()
+        futures = {
+            executor.submit(_call_in_worker, job_id, func, tuple(args)): index
+            for index, (func, args) in enumerate(tasks)
+        }
+        results: List[Any] = [None] * len(tasks)
+        pending = set(futures)
+        try:
+            while pending:
+                control.check()
+                done, pending = wait(
+                    pending, timeout=POLL_INTERVAL_SECONDS, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    result, cpu_seconds = future.result()
+                    control.record_usage(cpu_seconds=cpu_seconds)
+                    results[futures[future]] = result
+                control.stage_progress = 1 - len(pending) / len(tasks)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        return results
+
+    def run(self, job_id: str, func: Callable[..., Any], *args) -> Any:
+        """Run ``func(*args)`` in a worker process; see ``run_tasks``."""
+        return self.run_tasks(job_id, [(func, args)])[0]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Create a singleton instance
+cpu_pool = CPUPool()
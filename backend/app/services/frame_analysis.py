@@ -0,0 +1,234 @@
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.services.cpu_pool import cpu_pool
+from app.services.job_control import job_controls
+
+logger = logging.getLogger(__name__)
+
+FACE_CASCADE = "haarcascade_frontalface_default.xml"
+
+# Per-process face detector, loaded once by each worker
+_face_detector = None
+
+
+def _import_cv2():
+    try:
+        import cv2
+    except ImportError:
+        raise Exception(
+            "Failed to analyze video frames: OpenCV is not installed "
+            "(pip install -r requirements-vision.txt)"
+        )
+    return cv2
+
+
+def _detector():
+    global _face_detector
+    if _face_detector is None:
+        cv2 = _import_cv2()
+        _face_detector = cv2.CascadeClassifier(cv2.data.haarcascades + FACE_CASCADE)
+    return _face_detector
+
+
+def analyze_segment(
+    video_path: str, start_frame: int, end_frame: int, frame_step: int
+) -> Dict[str, List[float]]:
+    """
+    Sample every ``frame_step``-th frame in ``[start_frame, end_frame)``.
+
+    Runs in a worker process. For each sample it records the largest face
+    (normalized center and width, NaN when there is none) and the mean
+    absolute difference from the previous sample.
+    """
+    cv2 = _import_cv2()
+    detector = _detector()
+    samples: Dict[str, List[float]] = {
+        "frames": [],
+        "face_x": [],
+        "face_y": [],
+        "face_size": [],
+        "motion": [],
+    }
+
+    capture = cv2.VideoCapture(video_path)
+    try:
+        # Start one step early so the first sample has a frame to diff against
+        position = max(start_frame - frame_step, 0)
+        capture.set(cv2.CAP_PROP_POS_FRAMES, position)
+        previous = None
+        while position < end_frame:
+            if not capture.grab():
+                break
+            if (position - start_frame) % frame_step == 0 or previous is None:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                height, width = gray.shape
+                if width > settings.FRAME_ANALYSIS_MAX_WIDTH:
+                    scale = settings.FRAME_ANALYSIS_MAX_WIDTH / width
+                    gray = cv2.resize(
+                        gray,
+                        (settings.FRAME_ANALYSIS_MAX_WIDTH, int(height * scale)),
+                        interpolation=cv2.INTER_AREA,
+                    )
+                    height, width = gray.shape
+
+                if position >= start_frame:
+                    faces = detector.detectMultiScale(
+                        gray,
+                        scaleFactor=1.2,
+                        minNeighbors=5,
+                        minSize=(width // 12, width // 12),
+                    )
+                    if len(faces):
+                        x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+                        samples["face_x"].append((x + w / 2) / width)
+                        samples["face_y"].append((y + h / 2) / height)
+                        samples["face_size"].append(w / width)
+                    else:
+                        samples["face_x"].append(math.nan)
+                        samples["face_y"].append(math.nan)
+                        samples["face_size"].append(math.nan)
+                    motion = math.nan
+                    if previous is not None:
+                        motion = float(cv2.absdiff(gray, previous).mean()) / 255
+                    samples["frames"].append(position)
+                    samples["motion"].append(motion)
+                previous = gray
+            position += 1
+    finally:
+        capture.release()
+
+    return samples
+
+
+def _nan_stat(values, func) -> Optional[float]:
+    import numpy as np
+
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    return round(float(func(values)), 4)
+
+
+def summarize_frames(
+    samples: Dict[str, Any], fps: float, frame_step: int
+) -> Dict[str, Any]:
+    """
+    Summary statistics and a windowed time series of sampled frames.
+
+    Head motion is the distance the face center moved between consecutive
+    samples, per second, with coordinates normalized to the frame size.
+    """
+    import numpy as np
+
+    times = np.asarray(samples["frames"], dtype=np.float64) / fps
+    face_x = np.asarray(samples["face_x"], dtype=np.float64)
+    face_y = np.asarray(samples["face_y"], dtype=np.float64)
+    motion = np.asarray(samples["motion"], dtype=np.float64)
+    interval = frame_step / fps
+    present = ~np.isnan(face_x)
+
+    head_motion = np.full(len(times), np.nan)
+    if len(times) > 1:
+        head_motion[1:] = np.hypot(np.diff(face_x), np.diff(face_y)) / np.diff(times)
+
+    # Longest run of consecutive samples without a face
+    absent = np.concatenate(([0], (~present).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(absent))
+    longest_absent = int((edges[1::2] - edges[::2]).max()) if len(edges) else 0
+
+    window = settings.FRAME_ANALYSIS_WINDOW_SECONDS
+    windows = (times // window).astype(np.int64)
+    window_count = int(windows.max()) + 1 if len(windows) else 0
+
+    def window_mean(values):
+        known = ~np.isnan(values)
+        sums = np.bincount(
+            windows[known], weights=values[known], minlength=window_count
+        )
+        counts = np.bincount(windows[known], minlength=window_count)
+        means = np.divide(
+            sums, counts, out=np.full(window_count, np.nan), where=counts > 0
+        )
+        return [None if np.isnan(mean) else round(float(mean), 4) for mean in means]
+
+    return {
+        "sample_fps": round(1 / interval, 3),
+        "samples": len(times),
+        "duration_seconds": round(float(times[-1] + interval), 2) if len(times) else 0.0,
+        "face_presence_ratio": round(float(present.mean()), 3) if len(times) else 0.0,
+        "off_screen_seconds": round(float((~present).sum() * interval), 2),
+        "longest_off_screen_seconds": round(longest_absent * interval, 2),
+        "head_motion_mean": _nan_stat(head_motion, np.mean),
+        "head_motion_p90": _nan_stat(head_motion, lambda v: np.percentile(v, 90)),
+        "motion_mean": _nan_stat(motion, np.mean),
+        "motion_p90": _nan_stat(motion, lambda v: np.percentile(v, 90)),
+        "series": {
+            "window_seconds": window,
+            "face_presence": window_mean(present.astype(np.float64)),
+            "head_motion": window_mean(head_motion),
+            "motion": window_mean(motion),
+        },
+    }
+
+
+def analyze_frames(video_path: str, job_id: str) -> Dict[str, Any]:
+    """
+    Sample frames of a video and measure face presence and motion locally.
+
+    The video is split into segments that are decoded in parallel in the CPU
+    process pool.
+    """
+    cv2 = _import_cv2()
+    control = job_controls.get(job_id)
+
+    capture = cv2.VideoCapture(video_path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+    if fps <= 0 or frame_count <= 0:
+        raise Exception(f"Failed to analyze video frames: cannot read {video_path}")
+
+    frame_step = max(int(round(fps / settings.FRAME_SAMPLE_FPS)), 1)
+    segment_frames = max(
+        int(settings.FRAME_ANALYSIS_SEGMENT_SECONDS * fps) // frame_step, 1
+    ) * frame_step
+    segments = [
+        (start, min(start + segment_frames, frame_count))
+        for start in range(0, frame_count, segment_frames)
+    ]
+    logger.info(
+        f"Analyzing {frame_count} frames of {video_path} in {len(segments)} "
+        f"segments, every {frame_step} frames"
+    )
+
+    try:
+        results = cpu_pool.run_tasks(
+            job_id,
+            [
+                (analyze_segment, (video_path, start, end, frame_step))
+                for start, end in segments
+            ],
+        )
+    except Exception as e:
+        logger.error(f"Error analyzing video frames: {str(e)}")
+        raise Exception(f"Failed to analyze video frames: {str(e)}")
+
+    control.record_usage(bytes_read=os.path.getsize(video_path))
+    samples = {
+        name: [value for segment in results for value in segment[name]]
+        for name in results[0]
+    }
+    summary = summarize_frames(samples, fps, frame_step)
+    logger.info(
+        f"Frame analysis completed: {summary['samples']} samples, "
+        f"face present {summary['face_presence_ratio']:.0%}"
+    )
+    return summary
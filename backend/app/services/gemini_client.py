@@ -0,0 +1,37 @@
+from typing import TYPE_CHECKING
+from app.config import settings
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+
+
+def create_gemini_client() -> "genai.Client":
+    """
+    Create a Gemini client whose HTTP calls time out instead of hanging forever.
+
+    The SDK is imported here rather than at module load, which keeps it out
+    of API startup.
+    """
+    from google import genai
+    from google.genai import types
+
+    return genai.Client(
+        api_key=settings.GEMINI_API_KEY,
+        http_options=types.HttpOptions(
+            timeout=int(settings.GEMINI_REQUEST_TIMEOUT_SECONDS * 1000),
+            base_url=settings.GEMINI_BASE_URL or None,
+        ),
+    )
+
+
+def uploaded_file_content(file_uri: str, mime_type: str) -> "types.Content":
+    """
+    Wrap an uploaded Gemini file as user content for a prompt.
+    """
+    from google.genai import types
+
+    return types.Content(
+        role="user",
+        parts=[types.Part.from_uri(file_uri=file_uri, mime_type=mime_type)],
+    )
@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import pathlib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set
+from app.services.gemini_client import create_gemini_client
+from app.services.job_control import job_controls
+from app.services.rate_limiter import rate_limiter
+from app.utils.metrics import BYTES_UPLOADED, provider_call, stage_timer
+from app.utils.tracing import start_span
+
+if TYPE_CHECKING:
+    from google import genai
+
+logger = logging.getLogger(__name__)
+
+# Gemini keeps uploaded files for 48 hours; assume that when no expiry is returned
+DEFAULT_FILE_LIFETIME = timedelta(hours=48)
+# Do not hand out a file that expires within this window
+EXPIRY_MARGIN = timedelta(minutes=10)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path: str) -> str:
+    """
+    Compute the SHA-256 hash of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class GeminiFileHandle:
+    """An uploaded, processed Gemini file that can be referenced by URI"""
+
+    name: str
+    uri: str
+    mime_type: str
+    expires_at: datetime
+    job_ids: Set[str] = field(default_factory=set)
+
+    def is_valid(self) -> bool:
+        return self.expires_at - EXPIRY_MARGIN > datetime.now(timezone.utc)
+
+    def is_expired(self) -> bool:
+        return self.expires_at <= datetime.now(timezone.utc)
+
+
+class GeminiFileRegistry:
+    """
+    Registry of uploaded Gemini files keyed by content hash.
+
+    Any stage (body language, audio analysis, retries) that needs the same
+    media reuses the existing upload while it is still valid, including
+    re-scores and new jobs for the same bytes after the first job finished.
+    Handles are kept until Gemini expires the file, or until every job using
+    it is cancelled or has its results removed by retention, at which point
+    the file is deleted from Gemini.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, GeminiFileHandle] = {}
+        self._lock = threading.Lock()
+        # Per-content upload lock and the number of callers holding or
+        # waiting for it; the entry is dropped when the last one leaves
+        self._upload_locks: Dict[str, List] = {}
+
+    @contextmanager
+    def _upload_lock(self, content_hash: str) -> Iterator[None]:
+        with self._lock:
+            entry = self._upload_locks.setdefault(content_hash, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._upload_locks[content_hash]
+
+    def _prune_expired(self):
+        with self._lock:
+            for content_hash, handle in list(self.files.items()):
+                if handle.is_expired():
+                    del self.files[content_hash]
+
+    def get_or_upload(
+        self,
+        client: "genai.Client",
+        file_path: str,
+        job_id: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        media_label: str = "video",
+    ) -> GeminiFileHandle:
+        """
+        Return a processed Gemini file for the given media, uploading it if needed.
+        """
+        content_hash = content_hash or file_content_hash(file_path)
+        self._prune_expired()
+
+        # Serialize uploads of the same content so concurrent callers share one
+        with self._upload_lock(content_hash):
+            # Claim the handle under the registry lock so a concurrent
+            # release_job cannot delete the file before it is returned
+            with self._lock:
+                handle = self.files.get(content_hash)
+                if handle and handle.is_valid():
+                    if job_id:
+                        handle.job_ids.add(job_id)
+                    logger.info(f"Reusing Gemini file {handle.name} for {media_label}")
+                    return handle
+
+            handle = self._upload(client, file_path, media_label, job_id)
+            with self._lock:
+                self.files[content_hash] = handle
+                if job_id:
+                    handle.job_ids.add(job_id)
+            return handle
+
+    def _upload(
+        self,
+        client: "genai.Client",
+        file_path: str,
+        media_label: str,
+        job_id: Optional[str] = None,
+    ) -> GeminiFileHandle:
+        control = job_controls.get(job_id) if job_id else None
+
+        file_size = os.path.getsize(file_path)
+        with (
+            stage_timer("gemini_upload_wait"),
+            provider_call("gemini", "files_upload"),
+            start_span("gemini.files_upload", media=media_label, bytes=file_size),
+        ):
+            # Upload the file using the API
+            rate_limiter.acquire("gemini_requests", control=control)
+            with rate_limiter.concurrency("gemini_uploads", control=control):
+                file_upload = client.files.upload(file=pathlib.Path(file_path))
+            BYTES_UPLOADED.labels("gemini").inc(file_size)
+            if control:
+                control.record_usage(bytes_read=file_size, bytes_uploaded=file_size)
+
+            # Wait for the file to be processed
+            while file_upload.state == "PROCESSING":
+                logger.info(f"Waiting for {media_label} to be processed by Gemini AI.")
+                time.sleep(10)
+                try:
+                    if control:
+                        control.check()
+                except Exception:
+                    # The job was cancelled or ran out of time; don't leak the upload
+                    client.files.delete(name=file_upload.name)
+                    raise
+                file_upload = client.files.get(name=file_upload.name)
+
+            if file_upload.state == "FAILED":
+                raise ValueError(
+                    f"{media_label.capitalize()} processing failed with state: {file_upload.state}"
+                )
+
+        logger.info(
+            f"{media_label.capitalize()} processing complete: {file_upload.uri}"
+        )
+
+        expires_at = file_upload.expiration_time or (
+            datetime.now(timezone.utc) + DEFAULT_FILE_LIFETIME
+        )
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return GeminiFileHandle(
+            name=file_upload.name,
+            uri=file_upload.uri,
+            mime_type=file_upload.mime_type,
+            expires_at=expires_at,
+        )
+
+    def release_job(self, job_id: str):
+        """
+        Drop a job's references and delete files no other job is using.
+        """
+        with self._lock:
+            released = []
+            for content_hash, handle in list(self.files.items()):
+                if job_id not in handle.job_ids:
+                    continue
+                handle.job_ids.discard(job_id)
+                if not handle.job_ids:
+                    released.append(handle)
+                    del self.files[content_hash]
+
+        if not released:
+            return
+
+        client = create_gemini_client()
+        for handle in released:
+            try:
+                client.files.delete(name=handle.name)
+                logger.info(f"Deleted Gemini file {handle.name}")
+            except Exception as e:
+                logger.warning(f"Failed to delete Gemini file {handle.name}: {str(e)}")
+
+
+# Create a singleton instance
+gemini_file_registry = GeminiFileRegistry()
@@ -0,0 +1,56 @@
+import logging
+from typing import Dict, Optional
+from app.models.analysis import AnalysisJob, job_db, ProcessingStatus
+
+logger = logging.getLogger(__name__)
+
+
+class InFlightRegistry:
+    """
+    Registry of running pipelines keyed by content hash and pipeline config.
+
+    A job uploaded while an identical video is still being processed becomes a
+    follower of the running (leader) job: it receives every status and progress
+    update of the leader and the same results when the leader completes.
+    All access happens on the event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.leaders: Dict[str, str] = {}
+
+    def attach(self, key: str, job: AnalysisJob) -> Optional[AnalysisJob]:
+        """
+        Attach a job to the running pipeline for ``key``, if there is one.
+
+        Returns the leader job, or None when the caller should start its own
+        pipeline (the job is then registered as the leader).
+        """
+        leader = job_db.get_job(self.leaders.get(key, ""))
+        if leader and leader.status in (
+            ProcessingStatus.PENDING,
+            ProcessingStatus.PROCESSING,
+        ):
+            job.leader_job_id = leader.job_id
+            job.status = leader.status
+            job.current_step = leader.current_step
+            job.progress = leader.progress
+            for stage, timing in leader.timings.items():
+                job.timings.setdefault(stage, timing)
+            leader.followers.append(job)
+            logger.info(f"Job {job.job_id} attached to in-flight job {leader.job_id}")
+            return leader
+
+        job.inflight_key = key
+        self.leaders[key] = job.job_id
+        return None
+
+    def release(self, job: AnalysisJob):
+        """
+        Stop routing new identical uploads to a job whose pipeline has finished.
+        """
+        if job.inflight_key and self.leaders.get(job.inflight_key) == job.job_id:
+            del self.leaders[job.inflight_key]
+
+
+# Create a singleton instance
+inflight_jobs = InFlightRegistry()
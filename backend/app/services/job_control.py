@@ -0,0 +1,275 @@
+import contextvars
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set
+import requests
+from app.utils.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# How often blocking waits check for cancellation
+POLL_INTERVAL_SECONDS = 0.5
+
+# ffmpeg prints the input duration to stderr and, with "-progress pipe:1",
+# the position reached so far to stdout
+FFMPEG_DURATION_PATTERN = re.compile(rb"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+FFMPEG_OUT_TIME_PATTERN = re.compile(rb"out_time_us=(\d+)")
+
+
+class JobCancelled(Exception):
+    """Raised inside a stage when its job has been cancelled"""
+
+
+class StageDeadlineExceeded(Exception):
+    """Raised inside a stage when it runs past its deadline"""
+
+
+class JobControl:
+    """
+    Cancellation and deadline state shared between a job's pipeline stages.
+
+    Stages running in worker threads register their ffmpeg processes and HTTP
+    sessions here so that cancelling the job, or hitting a stage deadline,
+    terminates the actual work instead of only abandoning it. They also report
+    the resources the current stage used and how far along it is.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.cancelled = threading.Event()
+        self.deadline: Optional[float] = None
+        self.usage: Dict[str, float] = {}
+        # Fraction of the current stage done, when the stage can measure it
+        self.stage_progress: Optional[float] = None
+        self._processes: Set[subprocess.Popen] = set()
+        self._sessions: Set[requests.Session] = set()
+        self._lock = threading.Lock()
+        self.start_stage(None)
+
+    def start_stage(self, timeout_seconds: Optional[float]):
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+        self.stage_progress = None
+        with self._lock:
+            self.usage = {
+                "cpu_seconds": 0.0,
+                "bytes_read": 0,
+                "bytes_written": 0,
+                "bytes_uploaded": 0,
+            }
+
+    def record_usage(self, **amounts: float):
+        """
+        Add CPU seconds or byte counts to the current stage's usage.
+        """
+        with self._lock:
+            for key, amount in amounts.items():
+                self.usage[key] = self.usage.get(key, 0) + amount
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def check(self):
+        """
+        Raise if the job was cancelled or the current stage is out of time.
+        """
+        if self.cancelled.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise StageDeadlineExceeded(f"Job {self.job_id} stage deadline exceeded")
+
+    def cancel(self):
+        self.cancelled.set()
+        self.abort()
+
+    def abort(self):
+        """
+        Terminate running subprocesses and close open HTTP sessions.
+        """
+        with self._lock:
+            processes = list(self._processes)
+            sessions = list(self._sessions)
+
+        for process in processes:
+            if process.poll() is None:
+                logger.info(f"Killing process {process.pid} of job {self.job_id}")
+                process.kill()
+        for session in sessions:
+            session.close()
+
+    @contextmanager
+    def http_session(self):
+        """
+        Provide a requests session that is closed when the job is aborted.
+        """
+        session = requests.Session()
+        with self._lock:
+            self._sessions.add(session)
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._sessions.discard(session)
+            session.close()
+
+    def request_timeout(self, max_seconds: float) -> float:
+        """
+        Timeout for a blocking call: ``max_seconds``, capped by the time left
+        before the stage deadline.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return max_seconds
+        return max(min(max_seconds, remaining), 1.0)
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking call that cannot be aborted (an SDK request) in a
+        helper thread, waiting until it returns, the job is cancelled or the
+        stage deadline passes.
+
+        On cancellation the caller is released at once; the abandoned call
+        finishes on its own, so give it a timeout from ``request_timeout``.
+        """
+        self.check()
+        future: Future = Future()
+        context = contextvars.copy_context()
+
+        def run():
+            try:
+                future.set_result(context.run(func, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        thread = threading.Thread(target=run, name=f"job-{self.job_id}-call")
+        thread.daemon = True
+        thread.start()
+        while True:
+            try:
+                return future.result(timeout=POLL_INTERVAL_SECONDS)
+            except FutureTimeout:
+                self.check()
+
+    def run_command(
+        self, command: List[str], track_progress: bool = False
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a subprocess that is killed on cancellation or deadline.
+
+        Behaves like ``subprocess.run(command, check=True, capture_output=True,
+        text=True)``. The CPU time of the process is added to the stage usage.
+        With ``track_progress``, the command must be an ffmpeg call with
+        ``-progress pipe:1`` and its position updates ``stage_progress``.
+        """
+        self.check()
+        with (
+            start_span("subprocess", command=command[0], job_id=self.job_id) as span,
+            tempfile.TemporaryFile() as stdout_file,
+            tempfile.TemporaryFile() as stderr_file,
+        ):
+            process = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file)
+            with self._lock:
+                self._processes.add(process)
+
+            try:
+                self._wait(process, stdout_file, stderr_file, track_progress)
+            finally:
+                with self._lock:
+                    self._processes.discard(process)
+            span.set_attribute("returncode", process.returncode)
+
+            stdout_file.seek(0)
+            stderr_file.seek(0)
+            stdout = stdout_file.read().decode(errors="replace")
+            stderr = stderr_file.read().decode(errors="replace")
+
+        # Killed from another thread by cancel() or abort()
+        self.check()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode, command, output=stdout, stderr=stderr
+            )
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    def _wait(
+        self, process: subprocess.Popen, stdout_file, stderr_file, track_progress: bool
+    ):
+        """
+        Reap the process with wait4() to get its resource usage.
+        """
+        total_us = None
+        # Short commands (ffprobe) finish fast; back off to the poll interval
+        delay = 0.01
+        while True:
+            try:
+                pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+            except ChildProcessError:
+                # Already reaped by poll() in abort(); its return code is set
+                return
+            if pid:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                self.record_usage(cpu_seconds=rusage.ru_utime + rusage.ru_stime)
+                return
+
+            try:
+                self.check()
+            except Exception:
+                process.kill()
+                process.wait()
+                raise
+
+            if track_progress:
+                if total_us is None:
+                    total_us = self._ffmpeg_duration_us(stderr_file)
+                position_us = self._ffmpeg_position_us(stdout_file)
+                if total_us and position_us is not None:
+                    self.stage_progress = min(position_us / total_us, 1.0)
+            time.sleep(delay)
+            delay = min(delay * 2, POLL_INTERVAL_SECONDS)
+
+    @staticmethod
+    def _ffmpeg_duration_us(stderr_file) -> Optional[int]:
+        # pread leaves the file offset shared with the child untouched
+        head = os.pread(stderr_file.fileno(), 65536, 0)
+        match = FFMPEG_DURATION_PATTERN.search(head)
+        if not match:
+            return None
+        hours, minutes, seconds = match.groups()
+        return int((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1e6)
+
+    @staticmethod
+    def _ffmpeg_position_us(stdout_file) -> Optional[int]:
+        size = os.fstat(stdout_file.fileno()).st_size
+        tail = os.pread(stdout_file.fileno(), 4096, max(0, size - 4096))
+        positions = FFMPEG_OUT_TIME_PATTERN.findall(tail)
+        return int(positions[-1]) if positions else None
+
+
+class JobControlRegistry:
+    def __init__(self):
+        self.controls: Dict[str, JobControl] = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id: str) -> JobControl:
+        with self._lock:
+            control = self.controls.get(job_id)
+            if control is None:
+                control = self.controls[job_id] = JobControl(job_id)
+            return control
+
+    def remove(self, job_id: str):
+        with self._lock:
+            self.controls.pop(job_id, None)
+
+
+# Create a singleton instance
+job_controls = JobControlRegistry()
@@ -0,0 +1,319 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+# S3 rejects multipart parts smaller than this, except the last one
+MIN_MULTIPART_CHUNK_BYTES = 5 * 1024 * 1024
+# Names of the copies written by ScratchCache (see ScratchCache.path)
+SCRATCH_ENTRY_PATTERN = re.compile(r"[0-9a-f]{32}(\.\w+)?")
+
+
+def storage_key(kind: str, filename: str) -> str:
+    """Key of an artifact: "videos/<file>" or "results/<file>"."""
+    return f"{kind}/{filename}"
+
+
+class LocalStorage:
+    """
+    Artifacts stored in the local upload and results directories.
+    """
+
+    def __init__(self):
+        self.directories: Dict[str, Path] = {
+            "videos": settings.VIDEO_UPLOAD_DIR,
+            "results": settings.RESULTS_DIR,
+        }
+
+    def local_path(self, key: str) -> str:
+        kind, _, filename = key.partition("/")
+        if kind not in self.directories or filename != os.path.basename(filename):
+            raise ValueError(f"Invalid storage key: {key}")
+        return os.path.join(self.directories[kind], filename)
+
+    def save_stream(self, key: str, stream: BinaryIO) -> Tuple[int, str]:
+        """
+        Write ``stream`` under ``key``, hashing it in the same pass; returns
+        the size and SHA-256 hex digest.
+        """
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "wb") as buffer:
+            for chunk in iter(lambda: stream.read(COPY_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                buffer.write(chunk)
+                size += len(chunk)
+        return size, digest.hexdigest()
+
+    def publish(self, key: str, local_file: str):
+        """Make a file written by the pipeline available under ``key``."""
+        path = self.local_path(key)
+        if os.path.abspath(local_file) != os.path.abspath(path):
+            shutil.move(local_file, path)
+
+    def fetch(self, key: str) -> str:
+        """Return a local path of the object, for ffmpeg and provider uploads."""
+        return self.local_path(key)
+
+    def read_bytes(self, key: str) -> bytes:
+        with open(self.local_path(key), "rb") as f:
+            return f.read()
+
+    def release(self, key: str):
+        """The pipeline no longer needs the path returned by ``fetch``."""
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def presigned_url(
+        self, key: str, filename: Optional[str] = None, content_type: str = ""
+    ) -> Optional[str]:
+        """Local files are served by the API itself."""
+        return None
+
+
+class ScratchCache:
+    """
+    Size-capped local copies of remote objects for tools that need a path.
+
+    Copies in use by a running pipeline are pinned; the least recently used
+    unpinned copies are evicted once the cache grows past its limit. Only
+    files named like the cache's own copies are ever counted or evicted, so
+    other files in the directory are left alone.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._download_locks: Dict[str, threading.Lock] = {}
+
+    def path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, name + os.path.splitext(key)[1])
+
+    def get(self, key: str, download) -> str:
+        """
+        Return a pinned local copy of ``key``, calling ``download(key, path)``
+        if it is not cached yet.
+        """
+        path = self.path(key)
+        with self._lock:
+            self.pins[key] = self.pins.get(key, 0) + 1
+            download_lock = self._download_locks.setdefault(key, threading.Lock())
+
+        try:
+            with download_lock:
+                if os.path.exists(path):
+                    os.utime(path)
+                else:
+                    os.makedirs(self.directory, exist_ok=True)
+                    partial_path = f"{path}.partial"
+                    download(key, partial_path)
+                    os.replace(partial_path, path)
+                    logger.info(f"Cached {key} in scratch space")
+        except Exception:
+            self.release(key)
+            raise
+
+        self._evict()
+        return path
+
+    def release(self, key: str):
+        with self._lock:
+            count = self.pins.get(key, 0) - 1
+            if count > 0:
+                self.pins[key] = count
+            else:
+                self.pins.pop(key, None)
+
+    def _evict(self):
+        with self._lock:
+            pinned = {self.path(key) for key in self.pins}
+        entries = [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and SCRATCH_ENTRY_PATTERN.fullmatch(entry.name)
+        ]
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if total <= self.max_bytes:
+                break
+            if entry.path in pinned:
+                continue
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class S3Storage:
+    """
+    Artifacts stored in an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    boto3 is an optional dependency (requirements-s3.txt), imported when the
+    backend is created.
+    """
+
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise Exception(
+                "Failed to create S3 storage: boto3 is not installed "
+                "(pip install -r requirements-s3.txt)"
+            )
+
+        if not settings.S3_BUCKET:
+            raise Exception("Failed to create S3 storage: S3_BUCKET is not set")
+
+        self.bucket = settings.S3_BUCKET
+        self.prefix = settings.S3_PREFIX
+        self.chunk_bytes = max(
+            settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024, MIN_MULTIPART_CHUNK_BYTES
+        )
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+            config=Config(signature_version="s3v4"),
+        )
+        self.scratch = ScratchCache(
+            settings.SCRATCH_DIR, settings.SCRATCH_CACHE_MAX_MB * 1024 * 1024
+        )
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def save_stream(self, key: str, stream: BinaryIO) -> Tuple[int, str]:
+        """
+        Stream ``stream`` to the bucket as a multipart upload, hashing it in
+        the same pass; only one part is held in memory at a time.
+        """
+        object_key = self.object_key(key)
+        digest = hashlib.sha256()
+        first = stream.read(self.chunk_bytes)
+        digest.update(first)
+        if len(first) < self.chunk_bytes:
+            self.client.put_object(Bucket=self.bucket, Key=object_key, Body=first)
+            return len(first), digest.hexdigest()
+
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=object_key
+        )["UploadId"]
+        parts = []
+        size = 0
+        try:
+            chunk = first
+            while chunk:
+                part_number = len(parts) + 1
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+                size += len(chunk)
+                chunk = stream.read(self.chunk_bytes)
+                digest.update(chunk)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=object_key, UploadId=upload_id
+            )
+            raise
+        return size, digest.hexdigest()
+
+    def publish(self, key: str, local_file: str):
+        """Upload a file written by the pipeline and drop the local copy."""
+        self.client.upload_file(local_file, self.bucket, self.object_key(key))
+        os.remove(local_file)
+
+    def fetch(self, key: str) -> str:
+        """Download the object into the scratch cache; call ``release`` after."""
+        return self.scratch.get(key, self._download)
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self.object_key(key)
+            )
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key)
+        return response["Body"].read()
+
+    def _download(self, key: str, path: str):
+        self.client.download_file(self.bucket, self.object_key(key), path)
+
+    def release(self, key: str):
+        self.scratch.release(key)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+
+    def presigned_url(
+        self, key: str, filename: Optional[str] = None, content_type: str = ""
+    ) -> Optional[str]:
+        """Time-limited URL the browser fetches (with range requests) directly."""
+        params = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        if content_type:
+            params["ResponseContentType"] = content_type
+        if filename:
+            safe_name = filename.replace('"', "")
+            params["ResponseContentDisposition"] = f'inline; filename="{safe_name}"'
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=settings.PRESIGNED_URL_EXPIRY_SECONDS,
+        )
+
+
+def create_storage():
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage()
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage()
+    raise Exception(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+
+
+# Create a singleton instance
+storage = create_storage()
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List
+import numpy as np
+from app.services.transcription_service import ms_to_time_format
+
+
+@dataclass
+class TurnTable:
+    """
+    Consecutive phrases of the same speaker merged into turns.
+
+    Turn ``i`` covers phrases ``phrase_starts[i]:phrase_ends[i]`` of the
+    phrase table; texts and time strings are only built when requested.
+    """
+
+    speakers: np.ndarray
+    start_ms: np.ndarray
+    end_ms: np.ndarray
+    confidences: np.ndarray
+    phrase_starts: np.ndarray
+    phrase_ends: np.ndarray
+    phrase_texts: List[str]
+
+    def __len__(self) -> int:
+        return len(self.speakers)
+
+    def text(self, index: int) -> str:
+        start, end = self.phrase_starts[index], self.phrase_ends[index]
+        return " ".join(self.phrase_texts[start:end])
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Turns as the dicts stored in transcript files."""
+        records = []
+        for index, (speaker, start_ms, end_ms, confidence) in enumerate(
+            zip(
+                self.speakers.tolist(),
+                self.start_ms.tolist(),
+                self.end_ms.tolist(),
+                self.confidences.tolist(),
+            )
+        ):
+            records.append(
+                {
+                    "speaker_id": speaker,
+                    "start_time_ms": start_ms,
+                    "end_time_ms": end_ms,
+                    "start_time": ms_to_time_format(start_ms),
+                    "end_time": ms_to_time_format(end_ms),
+                    "text": self.text(index),
+                    "confidence": confidence,
+                }
+            )
+        return records
+
+
+@dataclass
+class PhraseTable:
+    """
+    Azure phrases in columnar form, sorted by offset.
+
+    Missing confidences are stored as NaN so they can be excluded from
+    averages.
+    """
+
+    offsets_ms: np.ndarray
+    durations_ms: np.ndarray
+    speakers: np.ndarray
+    confidences: np.ndarray
+    texts: List[str]
+
+    @classmethod
+    def from_azure(cls, phrases: Iterable[Dict[str, Any]]) -> "PhraseTable":
+        """Build the table from Azure phrases, skipping those without a speaker."""
+        phrases = [phrase for phrase in phrases if "speaker" in phrase]
+        offsets = np.fromiter(
+            (phrase["offsetMilliseconds"] for phrase in phrases),
+            dtype=np.int64,
+            count=len(phrases),
+        )
+        order = np.argsort(offsets, kind="stable")
+        durations = np.fromiter(
+            (phrase["durationMilliseconds"] for phrase in phrases),
+            dtype=np.int64,
+            count=len(phrases),
+        )
+        speakers = np.fromiter(
+            (phrase["speaker"] for phrase in phrases),
+            dtype=np.int64,
+            count=len(phrases),
+        )
+        confidences = np.fromiter(
+            (phrase.get("confidence", np.nan) for phrase in phrases),
+            dtype=np.float64,
+            count=len(phrases),
+        )
+        return cls(
+            offsets_ms=offsets[order],
+            durations_ms=durations[order],
+            speakers=speakers[order],
+            confidences=confidences[order],
+            texts=[phrases[index]["text"] for index in order.tolist()],
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets_ms)
+
+    def turns(self) -> TurnTable:
+        """
+        Merge consecutive phrases of the same speaker into turns.
+
+        A turn's confidence is the duration-weighted mean of its phrases'
+        confidences (phrases without one are ignored); its end is the latest
+        end of its phrases.
+        """
+        count = len(self)
+        if count == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return TurnTable(
+                empty, empty, empty, np.empty(0), empty, empty, self.texts
+            )
+
+        starts = np.flatnonzero(np.diff(self.speakers, prepend=self.speakers[0] - 1))
+        ends = np.append(starts[1:], count)
+        end_ms = np.maximum.reduceat(self.offsets_ms + self.durations_ms, starts)
+
+        known = ~np.isnan(self.confidences)
+        confidences = np.where(known, self.confidences, 0.0)
+        weights = np.where(known, self.durations_ms, 0).astype(np.float64)
+        weighted_sum = np.add.reduceat(confidences * weights, starts)
+        weight_total = np.add.reduceat(weights, starts)
+        # Zero-length phrases carry no weight; fall back to a plain mean
+        plain_sum = np.add.reduceat(confidences, starts)
+        known_count = np.add.reduceat(known.astype(np.int64), starts)
+        turn_confidences = np.divide(
+            plain_sum,
+            known_count,
+            out=np.zeros(len(starts)),
+            where=known_count > 0,
+        )
+        turn_confidences = np.divide(
+            weighted_sum,
+            weight_total,
+            out=turn_confidences,
+            where=weight_total > 0,
+        )
+
+        return TurnTable(
+            speakers=self.speakers[starts],
+            start_ms=self.offsets_ms[starts],
+            end_ms=end_ms,
+            confidences=turn_confidences,
+            phrase_starts=starts,
+            phrase_ends=ends,
+            phrase_texts=self.texts,
+        )
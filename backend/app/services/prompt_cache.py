@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from string import Formatter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.job_control import JobControl, job_controls
+from app.services.rate_limiter import rate_limiter
+from app.utils.prompt_compaction import estimate_tokens
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Refresh a cached prefix this many seconds before the provider expires it
+REFRESH_MARGIN_SECONDS = 60
+# Minimum cached-content size Gemini accepts, by model family
+MIN_CACHED_TOKENS_PRO = 4096
+MIN_CACHED_TOKENS_DEFAULT = 1024
+
+
+def prompt_version_hash(*parts: str) -> str:
+    """
+    Hash prompt texts (and the model ID) into a stable version key.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def static_prompt_prefix(template: str) -> str:
+    """
+    Return the literal text of a format template before its first placeholder.
+
+    The result is exactly the start of ``template.format(...)`` for any field
+    values, so it can be cached independently of the per-job fields.
+    """
+    prefix = []
+    for literal_text, field_name, _, _ in Formatter().parse(template):
+        prefix.append(literal_text)
+        if field_name is not None:
+            break
+    return "".join(prefix)
+
+
+def min_cacheable_tokens(model_id: str) -> int:
+    """
+    Return the smallest prompt the provider will store as cached content.
+    """
+    if settings.GEMINI_PROMPT_CACHE_MIN_TOKENS > 0:
+        return settings.GEMINI_PROMPT_CACHE_MIN_TOKENS
+    if "pro" in model_id:
+        return MIN_CACHED_TOKENS_PRO
+    return MIN_CACHED_TOKENS_DEFAULT
+
+
+# Marks a prefix with no fresh entry (a None entry means caching is unavailable)
+_MISSING = object()
+
+
+@dataclass
+class _CachedPrefix:
+    name: Optional[str]
+    expires_at: float
+
+
+class PromptPrefixCache:
+    """
+    Registry of Gemini cached contents holding the static prompt prefixes.
+
+    Each (model, system prompt, template prefix) combination is registered once
+    with the provider and reused until shortly before its TTL expires. Prefixes
+    below the model's minimum cacheable size are sent uncached without asking
+    the provider; when the provider rejects a prefix anyway the rejection is
+    remembered for one TTL.
+    """
+
+    def __init__(self, enabled: bool, ttl_seconds: int):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, _CachedPrefix] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_cached_content(
+        self,
+        client,
+        model_id: str,
+        system_prompt: str,
+        prefix: str,
+        control: Optional[JobControl] = None,
+    ) -> Optional[str]:
+        """
+        Return the cached-content name for a prompt prefix, creating it if needed.
+        """
+        if not self.enabled:
+            return None
+        if estimate_tokens(system_prompt + prefix) < min_cacheable_tokens(model_id):
+            return None
+
+        key = prompt_version_hash(model_id, system_prompt, prefix)
+        with self._lock:
+            name = self._fresh_name(key)
+            if name is not _MISSING:
+                return name
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only requests for the same prefix wait for its creation; the rate
+        # limit and the network call happen outside the registry lock
+        with key_lock:
+            with self._lock:
+                name = self._fresh_name(key)
+            if name is not _MISSING:
+                return name
+
+            name = self._create(client, model_id, system_prompt, prefix, key, control)
+            with self._lock:
+                self._entries[key] = _CachedPrefix(
+                    name=name, expires_at=time.time() + self.ttl_seconds
+                )
+            return name
+
+    def _fresh_name(self, key: str):
+        entry = self._entries.get(key)
+        if entry and entry.expires_at - REFRESH_MARGIN_SECONDS > time.time():
+            return entry.name
+        return _MISSING
+
+    def _create(
+        self,
+        client,
+        model_id: str,
+        system_prompt: str,
+        prefix: str,
+        key: str,
+        control: Optional[JobControl],
+    ) -> Optional[str]:
+        from google.genai import types
+
+        rate_limiter.acquire("gemini_requests", control=control)
+        try:
+            cached_content = client.caches.create(
+                model=model_id,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"prompt-{key[:16]}",
+                    system_instruction=system_prompt,
+                    contents=[
+                        types.Content(
+                            role="user", parts=[types.Part.from_text(text=prefix)]
+                        )
+                    ],
+                    ttl=f"{self.ttl_seconds}s",
+                ),
+            )
+        except Exception as e:
+            logger.warning(
+                f"Prompt prefix caching unavailable for {key[:16]}: {str(e)}"
+            )
+            return None
+        name = cached_content.name
+        logger.info(f"Registered cached prompt prefix {key[:16]}: {name}")
+        return name
+
+    def build_request(
+        self,
+        client,
+        model_id: str,
+        system_prompt: str,
+        template: str,
+        media: Optional[List[Any]] = None,
+        response_schema: Any = None,
+        job_id: Optional[str] = None,
+        **fields: str,
+    ) -> Tuple[List[Any], "types.GenerateContentConfig"]:
+        """
+        Build the contents and config for a generate_content call.
+
+        When the static part of ``template`` is cached only the per-job remainder
+        of the prompt is sent, followed by any media parts. A ``response_schema``
+        switches the response to schema-constrained JSON.
+        """
+        from google.genai import types
+
+        media = media or []
+        output_config = {}
+        if response_schema is not None:
+            output_config = {
+                "response_mime_type": "application/json",
+                "response_schema": response_schema,
+            }
+
+        user_prompt = template.format(**fields)
+        prefix = static_prompt_prefix(template)
+
+        control = job_controls.get(job_id) if job_id else None
+        cache_name = self.get_cached_content(
+            client, model_id, system_prompt, prefix, control
+        )
+        if cache_name:
+            remainder = user_prompt[len(prefix) :]
+            return (
+                ([remainder] if remainder else []) + media,
+                types.GenerateContentConfig(
+                    cached_content=cache_name, temperature=0.0, **output_config
+                ),
+            )
+
+        return (
+            media + [user_prompt],
+            types.GenerateContentConfig(
+                system_instruction=system_prompt,
+                temperature=0.0,
+                **output_config,
+            ),
+        )
+
+
+# Create a singleton instance
+prompt_cache = PromptPrefixCache(
+    enabled=settings.GEMINI_PROMPT_CACHE_ENABLED,
+    ttl_seconds=settings.GEMINI_PROMPT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,255 @@
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from app.config import settings
+from app.services.job_control import JobControl
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep while waiting for tokens, so waits stay responsive
+MAX_WAIT_STEP_SECONDS = 1.0
+# A concurrency lease held by a crashed process is reclaimed after this long
+CONCURRENCY_LEASE_SECONDS = 3600
+
+# Token bucket: KEYS[1] = bucket, ARGV = capacity, refill per second, amount,
+# overdraw (1 takes the tokens even if the bucket goes negative, down to
+# -capacity). Returns how long the caller must wait (0 when the tokens were
+# taken).
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local overdraw = ARGV[4] == '1'
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= amount then
+    tokens = tokens - amount
+elseif overdraw then
+    tokens = math.max(tokens - amount, -capacity)
+else
+    wait = (amount - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+# Concurrency lease: KEYS[1] = lease set, ARGV = limit, lease id, lease ttl.
+# Returns 1 when the lease was granted.
+CONCURRENCY_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+def configured_rates() -> Dict[str, Tuple[float, float]]:
+    """
+    Token buckets as name -> (capacity, refill per second); 0 means unlimited.
+    """
+    per_minute = {
+        "gemini_requests": settings.GEMINI_REQUESTS_PER_MINUTE,
+        "gemini_tokens": settings.GEMINI_TOKENS_PER_MINUTE,
+        "azure_requests": settings.AZURE_REQUESTS_PER_MINUTE,
+    }
+    return {name: (limit, limit / 60.0) for name, limit in per_minute.items()}
+
+
+def configured_concurrency() -> Dict[str, int]:
+    """
+    Concurrency limits as name -> maximum holders; 0 means unlimited.
+    """
+    return {
+        "gemini_uploads": settings.GEMINI_MAX_CONCURRENT_UPLOADS,
+        "azure_uploads": settings.AZURE_MAX_CONCURRENT_UPLOADS,
+    }
+
+
+class RateLimiter(ABC):
+    """
+    Client-side pacing of provider calls.
+
+    ``acquire`` blocks until a token bucket has enough tokens (requests or
+    tokens per minute) and ``concurrency`` bounds how many calls of a kind run
+    at once. Callers run in worker threads, so blocking is intended; given the
+    job's ``control``, a wait ends with JobCancelled or StageDeadlineExceeded
+    once the job is cancelled or its stage runs out of time.
+    """
+
+    def __init__(self):
+        self.rates = configured_rates()
+        self.limits = configured_concurrency()
+
+    def acquire(
+        self, name: str, amount: float = 1.0, control: Optional[JobControl] = None
+    ):
+        capacity, rate = self.rates.get(name, (0, 0))
+        if not capacity:
+            return
+
+        # A request larger than the bucket can never fit; let it take it all
+        amount = min(amount, capacity)
+        started = time.monotonic()
+        while True:
+            if control is not None:
+                control.check()
+            wait = self._take(name, capacity, rate, amount)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, MAX_WAIT_STEP_SECONDS))
+
+        waited = time.monotonic() - started
+        if waited > MAX_WAIT_STEP_SECONDS:
+            logger.info(f"Rate limiter delayed {name} by {waited:.1f}s")
+
+    def debit(self, name: str, amount: float):
+        """
+        Charge tokens that were only known after a call (e.g. media tokens
+        reported by the provider) without waiting. The bucket may go negative,
+        so the following calls wait for the overdraft to refill.
+        """
+        capacity, rate = self.rates.get(name, (0, 0))
+        if not capacity or amount <= 0:
+            return
+        self._take(name, capacity, rate, amount, overdraw=True)
+
+    @contextmanager
+    def concurrency(self, name: str, control: Optional[JobControl] = None):
+        limit = self.limits.get(name, 0)
+        if not limit:
+            yield
+            return
+
+        lease = None
+        while lease is None:
+            if control is not None:
+                control.check()
+            lease = self._enter(name, limit, MAX_WAIT_STEP_SECONDS)
+        try:
+            yield
+        finally:
+            self._exit(name, lease)
+
+    @abstractmethod
+    def _take(
+        self,
+        name: str,
+        capacity: float,
+        rate: float,
+        amount: float,
+        overdraw: bool = False,
+    ) -> float:
+        """
+        Take ``amount`` tokens, or return how long to wait before retrying.
+        With ``overdraw`` the tokens are always taken, down to ``-capacity``.
+        """
+
+    @abstractmethod
+    def _enter(self, name: str, limit: int, timeout: float):
+        """Take a concurrency lease, or return None after waiting ``timeout``."""
+
+    @abstractmethod
+    def _exit(self, name: str, lease):
+        """Give back a lease returned by ``_enter``."""
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Rate limiter for a single process (single-node mode)"""
+
+    def __init__(self):
+        super().__init__()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _take(
+        self,
+        name: str,
+        capacity: float,
+        rate: float,
+        amount: float,
+        overdraw: bool = False,
+    ) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(name, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens >= amount or overdraw:
+                self._buckets[name] = (max(tokens - amount, -capacity), now)
+                return 0.0
+            self._buckets[name] = (tokens, now)
+            return (amount - tokens) / rate
+
+    def _enter(self, name: str, limit: int, timeout: float):
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                name, threading.BoundedSemaphore(limit)
+            )
+        return semaphore if semaphore.acquire(timeout=timeout) else None
+
+    def _exit(self, name: str, lease):
+        lease.release()
+
+
+class RedisRateLimiter(RateLimiter):
+    """Rate limiter shared by every process and pod using the same Redis"""
+
+    def __init__(self, redis_url: str, key_prefix: str = "ratelimit"):
+        super().__init__()
+        import redis
+
+        self.client = redis.Redis.from_url(redis_url)
+        self.key_prefix = key_prefix
+        self._take_script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._enter_script = self.client.register_script(CONCURRENCY_SCRIPT)
+
+    def _take(
+        self,
+        name: str,
+        capacity: float,
+        rate: float,
+        amount: float,
+        overdraw: bool = False,
+    ) -> float:
+        wait = self._take_script(
+            keys=[f"{self.key_prefix}:bucket:{name}"],
+            args=[capacity, rate, amount, int(overdraw)],
+        )
+        return float(wait)
+
+    def _enter(self, name: str, limit: int, timeout: float):
+        key = f"{self.key_prefix}:concurrency:{name}"
+        lease = str(uuid.uuid4())
+        args = [limit, lease, CONCURRENCY_LEASE_SECONDS]
+        if self._enter_script(keys=[key], args=args):
+            return lease
+        time.sleep(timeout)
+        return None
+
+    def _exit(self, name: str, lease):
+        self.client.zrem(f"{self.key_prefix}:concurrency:{name}", lease)
+
+
+def create_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        logger.info("Using Redis-backed rate limiter")
+        return RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryRateLimiter()
+
+
+# Create a singleton instance
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,114 @@
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+from app.config import settings
+from app.models.analysis import job_db
+from app.services.object_storage import storage, storage_key
+from app.utils.responses import EncodedBodyCache
+
+try:
+    import zstandard
+except ImportError:  # Fall back to gzip when zstandard is not installed
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD_SUFFIX = ".json.zst"
+GZIP_SUFFIX = ".json.gz"
+
+
+def artifact_filename(job_id: str, name: str) -> str:
+    """File name of a job artifact, e.g. "<job_id>_results.json.zst"."""
+    suffix = ZSTD_SUFFIX if zstandard else GZIP_SUFFIX
+    return f"{job_id}_{name}{suffix}"
+
+
+def encode_artifact(value: Any) -> bytes:
+    """Serialize ``value`` as compact JSON and compress it."""
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+    if zstandard:
+        compressor = zstandard.ZstdCompressor(level=settings.RESULT_COMPRESSION_LEVEL)
+        return compressor.compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decode_artifact(data: bytes, filename: str) -> Any:
+    if filename.endswith(ZSTD_SUFFIX):
+        if not zstandard:
+            raise Exception(f"Failed to read {filename}: zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif filename.endswith(GZIP_SUFFIX):
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def write_artifact_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def publish_artifact(job_id: str, name: str, data: bytes) -> str:
+    """
+    Store an encoded artifact of a job; returns its storage key.
+    """
+    filename = artifact_filename(job_id, name)
+    path = os.path.join(settings.RESULTS_DIR, filename)
+    write_artifact_file(path, data)
+    key = storage_key("results", filename)
+    storage.publish(key, path)
+    return key
+
+
+def read_artifact(key: str) -> Any:
+    return decode_artifact(storage.read_bytes(key), key)
+
+
+class ResultCache:
+    """
+    Bounded LRU of decoded job results, so completed jobs only keep a storage
+    key in memory and repeated reads of recent results skip decompression.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        value = read_artifact(key)
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def discard(self, key: str):
+        with self._lock:
+            self.entries.pop(key, None)
+
+
+# Create a singleton instance
+result_cache = ResultCache(settings.RESULT_CACHE_MAX_ENTRIES)
+# Encoded /results response bodies, keyed by job ID
+results_bodies = EncodedBodyCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+def forget_result(key: str):
+    """
+    Drop every cached copy of a removed result and detach it from its jobs.
+    """
+    result_cache.discard(key)
+    for job in job_db.list_jobs():
+        if job.result_key == key:
+            job.result_key = None
+            results_bodies.discard(job.job_id)
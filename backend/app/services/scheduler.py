@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+from app.models.analysis import AnalysisJob, job_db
+from app.schemas.analysis import JobPriority
+from app.utils.logging_setup import job_log_context
+from app.utils.profiling import profile_job
+from app.utils.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# Priority classes in the order they are served; earlier classes are strict
+PRIORITY_ORDER: List[JobPriority] = [JobPriority.INTERACTIVE, JobPriority.BATCH]
+
+
+def parse_tenant_weights(value: str) -> Dict[str, float]:
+    """
+    Parse "team-a=3,team-b=1" into a tenant -> weight mapping.
+    """
+    weights = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        tenant, weight = item.split("=", 1)
+        try:
+            weights[tenant.strip()] = max(float(weight), 0.01)
+        except ValueError:
+            logger.warning(f"Ignoring invalid tenant weight: {item}")
+    return weights
+
+
+class JobScheduler:
+    """
+    Dispatches queued jobs onto a bounded number of pipeline slots.
+
+    Interactive jobs always go before batch jobs. Within a priority class,
+    tenants are served by weighted fair queuing: each dispatched job advances
+    its tenant's virtual time by 1 / weight and the tenant with the smallest
+    virtual time goes next. A tenant never runs more than its concurrency cap,
+    which keeps one team from exhausting the shared Azure/Gemini quotas.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[str], Awaitable[None]],
+        max_concurrent_jobs: int,
+        tenant_max_concurrent_jobs: int,
+        tenant_weights: Dict[str, float],
+    ):
+        self.run_job = run_job
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs)
+        self.tenant_max_concurrent_jobs = max(1, tenant_max_concurrent_jobs)
+        self.tenant_weights = tenant_weights
+        self.queues: Dict[JobPriority, Dict[str, Deque[str]]] = {
+            priority: {} for priority in PRIORITY_ORDER
+        }
+        self.running: Dict[str, int] = {}
+        self.virtual_time: Dict[str, float] = {}
+        self._global_virtual_time = 0.0
+
+    def queued_count(self) -> int:
+        return sum(
+            len(queue) for queues in self.queues.values() for queue in queues.values()
+        )
+
+    def running_count(self) -> int:
+        return sum(self.running.values())
+
+    def submit(self, job: AnalysisJob):
+        """
+        Queue a job and start it as soon as its priority and tenant allow.
+        """
+        queue = self.queues[job.priority].setdefault(job.tenant, deque())
+        if not queue:
+            # A tenant returning from idle starts at the current virtual time
+            # rather than cashing in the share it did not use
+            self.virtual_time[job.tenant] = max(
+                self.virtual_time.get(job.tenant, 0.0), self._global_virtual_time
+            )
+        queue.append(job.job_id)
+        job.current_step = "Queued"
+        if "queued" not in job.timings:
+            job.start_timing("queued")
+        logger.info(
+            f"Queued job {job.job_id} (tenant={job.tenant}, priority={job.priority.value})"
+        )
+        self._dispatch()
+
+    def remove(self, job_id: str) -> bool:
+        """
+        Drop a job that has not started yet. Returns True if it was queued.
+        """
+        for queues in self.queues.values():
+            for queue in queues.values():
+                if job_id in queue:
+                    queue.remove(job_id)
+                    return True
+        return False
+
+    def promote(self, job: AnalysisJob, priority: JobPriority):
+        """
+        Move a still-queued job to a more urgent priority class.
+        """
+        if PRIORITY_ORDER.index(priority) >= PRIORITY_ORDER.index(job.priority):
+            return
+        if self.remove(job.job_id):
+            job.priority = priority
+            self.submit(job)
+
+    def _weight(self, tenant: str) -> float:
+        return self.tenant_weights.get(tenant, 1.0)
+
+    def _next_job(self) -> Optional[AnalysisJob]:
+        for priority in PRIORITY_ORDER:
+            eligible = [
+                tenant
+                for tenant, queue in self.queues[priority].items()
+                if queue
+                and self.running.get(tenant, 0) < self.tenant_max_concurrent_jobs
+            ]
+            if not eligible:
+                continue
+
+            # Serve the tenant whose next job has the earliest virtual finish time
+            tenant = min(
+                eligible,
+                key=lambda t: self.virtual_time.get(t, 0.0) + 1.0 / self._weight(t),
+            )
+            start = self.virtual_time.get(tenant, 0.0)
+            self._global_virtual_time = max(self._global_virtual_time, start)
+            self.virtual_time[tenant] = start + 1.0 / self._weight(tenant)
+
+            job = job_db.get_job(self.queues[priority][tenant].popleft())
+            if job:
+                return job
+            return self._next_job()
+        return None
+
+    def _dispatch(self):
+        while self.running_count() < self.max_concurrent_jobs:
+            job = self._next_job()
+            if job is None:
+                return
+            self.running[job.tenant] = self.running.get(job.tenant, 0) + 1
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: AnalysisJob):
+        try:
+            # Continue the trace started by the upload request
+            async with profile_job(job.job_id):
+                with start_span(
+                    "process_video_job",
+                    carrier=job.trace_context,
+                    job_id=job.job_id,
+                    tenant=job.tenant,
+                    priority=job.priority.value,
+                ), job_log_context(job.job_id):
+                    await self.run_job(job.job_id)
+        finally:
+            self.running[job.tenant] -= 1
+            self._dispatch()
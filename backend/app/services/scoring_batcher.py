@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from app.utils.logging_setup import job_log_context
+from app.utils.metrics import PROVIDER_RETRIES
+from app.utils.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+# (job_id, transcript, analysis_result)
+ScoringRequest = Tuple[str, str, Dict[str, Any]]
+
+
+class ScoringBatcher:
+    """
+    Collect scoring requests from concurrent jobs and score them together.
+
+    A batch is flushed once it reaches ``max_batch_size`` requests or when the
+    oldest pending request has waited ``max_wait_seconds``. Results are
+    demultiplexed back to each waiting job; any job missing from the batch
+    response is scored on its own with ``fallback_fn``.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[ScoringRequest]], Dict[str, Dict[str, Any]]],
+        fallback_fn: Callable[[str, Dict[str, Any], str], Dict[str, Any]],
+        executor: Executor,
+        max_batch_size: int,
+        max_wait_seconds: float,
+    ):
+        self.batch_fn = batch_fn
+        self.fallback_fn = fallback_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[Tuple[ScoringRequest, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Keep references so running batches are not garbage-collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def score(
+        self, job_id: str, transcript: str, analysis_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Queue a candidate for batched scoring and wait for its result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((job_id, transcript, analysis_result), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_seconds, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        # Drop waiters whose job was cancelled or timed out while queued
+        batch = [entry for entry in self._pending if not entry[1].done()]
+        self._pending = []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self):
+        """
+        Cancel queued and running batches and wait for them to finish.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _score_alone(
+        self, job_id: str, transcript: str, analysis_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        # The batch task runs in the context of whichever job flushed it, so
+        # tag the fallback with its own job for logs and token usage
+        with job_log_context(job_id):
+            return self.fallback_fn(transcript, analysis_result, job_id=job_id)
+
+    async def _run_batch(self, batch: List[Tuple[ScoringRequest, asyncio.Future]]):
+        try:
+            await self._score_batch(batch)
+        except asyncio.CancelledError:
+            # Shutting down: release the jobs still waiting on this batch
+            for _, future in batch:
+                future.cancel()
+            raise
+
+    async def _score_batch(self, batch: List[Tuple[ScoringRequest, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        requests = [request for request, _ in batch]
+        logger.info(f"Scoring batch of {len(requests)} candidates")
+
+        try:
+            with start_span("scoring.batch", batch_size=len(requests)):
+                results = await loop.run_in_executor(
+                    self.executor, self.batch_fn, requests
+                )
+        except Exception as e:
+            logger.error(f"Batched scoring failed, scoring individually: {str(e)}")
+            results = {}
+
+        for (job_id, transcript, analysis_result), future in batch:
+            if future.done():
+                continue
+            try:
+                result = results.get(job_id)
+                if result is None:
+                    logger.warning(f"No batched score for job {job_id}, retrying alone")
+                    PROVIDER_RETRIES.labels("gemini", "scoring").inc()
+                    with start_span("scoring.fallback", job_id=job_id, retry_count=1):
+                        result = await loop.run_in_executor(
+                            self.executor,
+                            self._score_alone,
+                            job_id,
+                            transcript,
+                            analysis_result,
+                        )
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,115 @@
+from typing import Any, Dict
+import numpy as np
+from app.services.phrase_table import PhraseTable
+
+# A silence within a speaker's turn at least this long counts as a long pause
+LONG_PAUSE_MS = 2000
+
+
+def _seconds(milliseconds: float) -> float:
+    return round(float(milliseconds) / 1000, 2)
+
+
+def _percentile_seconds(values: np.ndarray, percentile: float) -> float:
+    if len(values) == 0:
+        return 0.0
+    return _seconds(np.percentile(values, percentile))
+
+
+def speaker_statistics(phrases: PhraseTable) -> Dict[str, Any]:
+    """
+    Talk-time and turn-taking statistics of each speaker, measured from the
+    diarized phrase timeline.
+
+    Pauses are silences between phrases within a speaker's turn; response
+    latency is the silence before a turn that starts after the previous
+    speaker finished. A turn that starts before the previous one ended is an
+    interruption, and the time both speakers talk counts as overlap.
+    """
+    if len(phrases) == 0:
+        return {
+            "duration_seconds": 0.0,
+            "turn_count": 0,
+            "overlap_seconds": 0.0,
+            "speakers": [],
+        }
+
+    turns = phrases.turns()
+    phrase_ends = phrases.offsets_ms + phrases.durations_ms
+    duration_ms = phrase_ends.max() - phrases.offsets_ms[0]
+    speaker_ids, phrase_speakers = np.unique(phrases.speakers, return_inverse=True)
+    speaker_count = len(speaker_ids)
+
+    talk_ms = np.bincount(
+        phrase_speakers, weights=phrases.durations_ms, minlength=speaker_count
+    )
+    word_counts = np.fromiter(
+        (len(text.split()) for text in phrases.texts),
+        dtype=np.int64,
+        count=len(phrases),
+    )
+    words = np.bincount(phrase_speakers, weights=word_counts, minlength=speaker_count)
+
+    # Silences between consecutive phrases of the same turn
+    gaps = phrases.offsets_ms[1:] - phrase_ends[:-1]
+    within_turn = (phrases.speakers[1:] == phrases.speakers[:-1]) & (gaps > 0)
+    pauses = gaps[within_turn]
+    pause_speakers = phrase_speakers[1:][within_turn]
+
+    turn_speakers = np.searchsorted(speaker_ids, turns.speakers)
+    turn_ms = turns.end_ms - turns.start_ms
+    # Gap between each turn and the end of the turn before it
+    handover_ms = turns.start_ms[1:] - turns.end_ms[:-1]
+    responders = turn_speakers[1:]
+    latency_mask = handover_ms >= 0
+    interruption_mask = ~latency_mask
+    overlap_ms = np.minimum(turns.end_ms[:-1], turns.end_ms[1:]) - turns.start_ms[1:]
+    overlap_ms = np.where(interruption_mask, np.maximum(overlap_ms, 0), 0)
+
+    turn_counts = np.bincount(turn_speakers, minlength=speaker_count)
+    longest_turn_ms = np.zeros(speaker_count)
+    np.maximum.at(longest_turn_ms, turn_speakers, turn_ms)
+    interruptions = np.bincount(
+        responders[interruption_mask], minlength=speaker_count
+    )
+    interrupted = np.bincount(
+        turn_speakers[:-1][interruption_mask], minlength=speaker_count
+    )
+    total_talk_ms = talk_ms.sum()
+
+    speakers = []
+    for index, speaker_id in enumerate(speaker_ids.tolist()):
+        speaker_pauses = pauses[pause_speakers == index]
+        latencies = handover_ms[latency_mask & (responders == index)]
+        talk_minutes = talk_ms[index] / 60000
+        speakers.append(
+            {
+                "speaker_id": speaker_id,
+                "talk_time_seconds": _seconds(talk_ms[index]),
+                "talk_ratio": (
+                    round(float(talk_ms[index] / total_talk_ms), 3)
+                    if total_talk_ms
+                    else 0.0
+                ),
+                "turns": int(turn_counts[index]),
+                "words": int(words[index]),
+                "words_per_minute": (
+                    round(float(words[index] / talk_minutes), 1) if talk_minutes else 0.0
+                ),
+                "longest_monologue_seconds": _seconds(longest_turn_ms[index]),
+                "pause_count": len(speaker_pauses),
+                "long_pauses": int((speaker_pauses >= LONG_PAUSE_MS).sum()),
+                "pause_median_seconds": _percentile_seconds(speaker_pauses, 50),
+                "pause_p90_seconds": _percentile_seconds(speaker_pauses, 90),
+                "response_latency_median_seconds": _percentile_seconds(latencies, 50),
+                "interruptions": int(interruptions[index]),
+                "interrupted": int(interrupted[index]),
+            }
+        )
+
+    return {
+        "duration_seconds": _seconds(duration_ms),
+        "turn_count": len(turns),
+        "overlap_seconds": _seconds(overlap_ms.sum()),
+        "speakers": speakers,
+    }
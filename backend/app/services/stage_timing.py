@@ -0,0 +1,92 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in the order they run
+PIPELINE_STAGES = (
+    "audio_extraction",
+    "frame_analysis",
+    "transcription",
+    "body_language",
+    "scoring",
+)
+
+# Seconds per MB of video assumed for each stage until jobs have been measured
+DEFAULT_SECONDS_PER_MB = {
+    "audio_extraction": 0.1,
+    "frame_analysis": 0.5,
+    "transcription": 1.0,
+    "body_language": 2.0,
+    "scoring": 0.5,
+}
+# Elapsed-time estimates never claim a stage is finished before it is
+MAX_ESTIMATED_STAGE_FRACTION = 0.95
+BYTES_PER_MB = 1024 * 1024
+
+
+def enabled_stages() -> Tuple[str, ...]:
+    """Stages a job goes through with the current settings."""
+    if settings.FRAME_ANALYSIS_ENABLED:
+        return PIPELINE_STAGES
+    return tuple(stage for stage in PIPELINE_STAGES if stage != "frame_analysis")
+
+
+class StageDurationHistory:
+    """
+    Exponential moving average of each stage's duration per MB of video.
+
+    Used to weight the stages when turning elapsed time into job progress, so
+    the progress bar follows how long stages actually take on this deployment.
+    """
+
+    def __init__(self, smoothing: float = 0.2):
+        self.smoothing = smoothing
+        self.seconds_per_mb: Dict[str, float] = dict(DEFAULT_SECONDS_PER_MB)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, duration_seconds: float, video_bytes: int):
+        if stage not in self.seconds_per_mb or video_bytes <= 0:
+            return
+        observed = duration_seconds / (video_bytes / BYTES_PER_MB)
+        with self._lock:
+            previous = self.seconds_per_mb[stage]
+            self.seconds_per_mb[stage] = (
+                previous + (observed - previous) * self.smoothing
+            )
+
+    def expected_seconds(self, stage: str, video_bytes: int) -> float:
+        # Even tiny videos take a moment per stage; keep every weight positive
+        return max(self.seconds_per_mb[stage] * video_bytes / BYTES_PER_MB, 1.0)
+
+    def estimate_progress(
+        self,
+        stage: str,
+        elapsed_seconds: float,
+        video_bytes: int,
+        stage_fraction: Optional[float] = None,
+    ) -> float:
+        """
+        Overall job progress while ``stage`` has been running for ``elapsed_seconds``.
+
+        ``stage_fraction`` is the measured completion of the stage when known
+        (ffmpeg position); otherwise it is estimated from the expected duration.
+        """
+        stages = enabled_stages()
+        expected = {s: self.expected_seconds(s, video_bytes) for s in stages}
+        index = stages.index(stage)
+        if stage_fraction is None:
+            stage_fraction = min(
+                elapsed_seconds / expected[stage], MAX_ESTIMATED_STAGE_FRACTION
+            )
+
+        done = sum(expected[s] for s in stages[:index])
+        progress = (done + expected[stage] * stage_fraction) / sum(expected.values())
+        # 1.0 is reserved for a completed job
+        return round(min(progress, 0.99), 3)
+
+
+# Create a singleton instance
+stage_history = StageDurationHistory()
@@ -0,0 +1,207 @@
+import asyncio
+import glob
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Optional, Set
+from app.config import settings
+from app.models.analysis import job_db, ProcessingStatus
+from app.services.gemini_files import gemini_file_registry
+from app.services.object_storage import storage_key
+from app.services.result_store import forget_result
+from app.services.transcript_index import transcript_index
+from app.utils.metrics import DISK_FREE_BYTES, STORAGE_FILES_REMOVED
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = {
+    ProcessingStatus.COMPLETED,
+    ProcessingStatus.FAILED,
+    ProcessingStatus.CANCELLED,
+}
+HOUR_SECONDS = 3600
+
+
+class InsufficientStorage(Exception):
+    """Free disk space is below the configured watermark"""
+
+
+def free_disk_bytes(path: Optional[str] = None) -> int:
+    return shutil.disk_usage(path or settings.UPLOAD_DIR).free
+
+
+def check_free_space(incoming_bytes: int = 0):
+    """
+    Raise InsufficientStorage if storing ``incoming_bytes`` more would leave
+    less than STORAGE_MIN_FREE_MB free.
+    """
+    free = free_disk_bytes()
+    required = settings.STORAGE_MIN_FREE_MB * 1024 * 1024 + incoming_bytes
+    if free < required:
+        raise InsufficientStorage(
+            f"Insufficient storage: {free / (1024 * 1024):.0f} MB free, "
+            f"{required / (1024 * 1024):.0f} MB required"
+        )
+
+
+def _remove(path: str, kind: str) -> int:
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    STORAGE_FILES_REMOVED.labels(kind).inc()
+    return size
+
+
+def delete_intermediate_audio(job_id: str) -> int:
+    """
+    Delete the WAV (and compressed variants) extracted for a job; returns
+    the bytes freed.
+    """
+    freed = 0
+    pattern = os.path.join(settings.AUDIO_UPLOAD_DIR, f"{job_id}_audio*")
+    for path in glob.glob(pattern):
+        freed += _remove(path, "audio")
+    if freed:
+        logger.info(f"Deleted intermediate audio of job {job_id} ({freed} bytes)")
+    return freed
+
+
+class StorageLifecycleManager:
+    """
+    Periodically enforce retention on uploaded videos, leftover audio and
+    result files. Result artifacts are written compressed (see
+    result_store), so there is no separate cold tier.
+
+    Files of jobs that are still queued or running are never touched.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _active_paths(self) -> Set[str]:
+        active = set()
+        for job in job_db.list_jobs():
+            if job.status not in FINAL_STATUSES:
+                active.add(job.job_id)
+                if job.video_path:
+                    active.add(os.path.abspath(job.video_path))
+        return active
+
+    @staticmethod
+    def _job_id(filename: str) -> str:
+        # Artifacts are named "<job_id><extension>" or "<job_id>_<artifact>"
+        return filename.split("_", 1)[0].split(".", 1)[0]
+
+    def _expired_files(self, directory, max_age_hours: float, now: float):
+        if max_age_hours <= 0 or not os.path.isdir(directory):
+            return
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            if now - entry.stat().st_mtime > max_age_hours * HOUR_SECONDS:
+                yield entry
+
+    @staticmethod
+    def _unindex(job_id: str):
+        # Expired transcripts should no longer turn up in search
+        try:
+            transcript_index.remove_job(job_id)
+        except Exception as e:
+            logger.warning(f"Failed to remove job {job_id} from the index: {str(e)}")
+
+    @staticmethod
+    def _release_gemini_files(job_id: str):
+        # The job can no longer be re-scored, so its uploads may go
+        try:
+            gemini_file_registry.release_job(job_id)
+        except Exception as e:
+            logger.warning(
+                f"Failed to release Gemini files of job {job_id}: {str(e)}"
+            )
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Run one retention pass; returns counts of affected files.
+        """
+        now = time.time()
+        active = self._active_paths()
+        stats = {
+            "videos_deleted": 0,
+            "audio_deleted": 0,
+            "results_deleted": 0,
+            "bytes_freed": 0,
+        }
+        expired_jobs: Set[str] = set()
+
+        retention = [
+            (settings.VIDEO_UPLOAD_DIR, settings.VIDEO_RETENTION_HOURS, "videos"),
+            (settings.AUDIO_UPLOAD_DIR, settings.AUDIO_RETENTION_HOURS, "audio"),
+            (settings.RESULTS_DIR, settings.RESULTS_RETENTION_HOURS, "results"),
+        ]
+        for directory, max_age_hours, kind in retention:
+            for entry in self._expired_files(directory, max_age_hours, now):
+                if (
+                    self._job_id(entry.name) in active
+                    or os.path.abspath(entry.path) in active
+                ):
+                    continue
+                freed = _remove(entry.path, kind)
+                if freed:
+                    stats[f"{kind}_deleted"] += 1
+                    stats["bytes_freed"] += freed
+                if kind == "results":
+                    # Stop serving the removed result from memory
+                    forget_result(storage_key("results", entry.name))
+                    expired_jobs.add(self._job_id(entry.name))
+
+        for job_id in expired_jobs:
+            if settings.TRANSCRIPT_INDEX_ENABLED:
+                self._unindex(job_id)
+            self._release_gemini_files(job_id)
+
+        if any(stats.values()):
+            logger.info(f"Storage sweep: {stats}")
+        return stats
+
+    def request_sweep(self):
+        """Run a sweep now instead of waiting for the next interval."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Storage sweep failed: {str(e)}")
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), settings.STORAGE_SWEEP_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None and settings.STORAGE_SWEEP_INTERVAL_SECONDS > 0:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Create a singleton instance
+storage_lifecycle = StorageLifecycleManager()
+
+DISK_FREE_BYTES.set_function(free_disk_bytes)
@@ -0,0 +1,237 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Highlight markers around matched terms in snippets
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+SNIPPET_TOKENS = 16
+# Matching turns returned per job
+HITS_PER_JOB = 5
+QUERY_OPERATORS = {"AND", "OR", "NOT"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT,
+    turn_count INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    speaker_id INTEGER,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    start_time TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_job_id ON turns (job_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    text, content='turns', content_rowid='id', tokenize={tokenizer}
+);
+CREATE TRIGGER IF NOT EXISTS turns_insert AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_delete AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def fts_query(query: str) -> str:
+    """
+    Turn a user query into an FTS5 expression.
+
+    Every term is quoted, so punctuation such as "C++" or "node.js" is not
+    parsed as syntax. Terms must all match unless joined with OR; a trailing
+    ``*`` makes a term a prefix.
+
+    The tokenizer still decides what a term matches: "node.js" is the phrase
+    "node js", and "C++" or "C#" only differ from "C" when the tokenizer
+    keeps "+" and "#" in tokens (the default ``tokenchars '+#'``).
+    """
+    parts = []
+    for term in query.split():
+        if term in QUERY_OPERATORS:
+            parts.append(term)
+            continue
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', "")
+        if term:
+            parts.append(f'"{term}"' + ("*" if prefix else ""))
+    if not any(part not in QUERY_OPERATORS for part in parts):
+        raise ValueError("Search query has no terms")
+    return " ".join(parts)
+
+
+class TranscriptIndex:
+    """
+    SQLite FTS5 full-text index of transcript turns across all jobs.
+
+    Each completed transcript is added once, with the speaker and times of
+    every turn. Search ranks jobs by the BM25 score of their best matching
+    turn. The database is opened on first use.
+    """
+
+    def __init__(self, path: str, tokenizer: str):
+        self.path = path
+        self.tokenizer = tokenizer
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # The tokenizer may itself hold quoted arguments (tokenchars '+#')
+            tokenizer = "'" + self.tokenizer.replace("'", "''") + "'"
+            connection.executescript(SCHEMA.format(tokenizer=tokenizer))
+            self._connection = connection
+        return self._connection
+
+    def add_transcript(
+        self, job_id: str, turns: List[Dict[str, Any]], filename: Optional[str] = None
+    ):
+        """Index the turns of a job's transcript, replacing any earlier ones."""
+        rows = [
+            (
+                job_id,
+                turn["speaker_id"],
+                turn["start_time_ms"],
+                turn["end_time_ms"],
+                turn.get("start_time"),
+                turn["text"],
+            )
+            for turn in turns
+            if turn.get("text")
+        ]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM turns WHERE job_id = ?", (job_id,))
+                connection.executemany(
+                    "INSERT INTO turns (job_id, speaker_id, start_ms, end_ms, "
+                    "start_time, text) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                    (job_id, filename, len(rows), time.time()),
+                )
+        logger.info(f"Indexed {len(rows)} transcript turns of job {job_id}")
+
+    def remove_job(self, job_id: str):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM turns WHERE job_id = ?", (job_id,))
+                connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Jobs whose transcripts match ``query``, best first, each with its
+        best matching turns. Raises ValueError for an invalid query.
+        """
+        expression = fts_query(query)
+        try:
+            with self._lock:
+                connection = self._connect()
+                jobs = connection.execute(
+                    """
+                    WITH hits AS MATERIALIZED (
+                        SELECT rowid AS id, bm25(turns_fts) AS score
+                        FROM turns_fts
+                        WHERE turns_fts MATCH ?
+                    )
+                    SELECT turns.job_id, jobs.filename, MIN(hits.score) AS best,
+                           COUNT(*) AS hit_count
+                    FROM hits
+                    JOIN turns ON turns.id = hits.id
+                    LEFT JOIN jobs ON jobs.job_id = turns.job_id
+                    GROUP BY turns.job_id
+                    ORDER BY best
+                    LIMIT ? OFFSET ?
+                    """,
+                    (expression, limit, offset),
+                ).fetchall()
+                if not jobs:
+                    return []
+
+                job_ids = [job[0] for job in jobs]
+                placeholders = ",".join("?" * len(job_ids))
+                hits = connection.execute(
+                    f"""
+                    WITH scored AS MATERIALIZED (
+                        SELECT turns.id, turns.job_id, bm25(turns_fts) AS score
+                        FROM turns_fts
+                        JOIN turns ON turns.id = turns_fts.rowid
+                        WHERE turns_fts MATCH ? AND turns.job_id IN ({placeholders})
+                    ),
+                    best AS (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY job_id ORDER BY score
+                        ) AS rank
+                        FROM scored
+                    )
+                    SELECT turns.job_id, turns.speaker_id, turns.start_ms,
+                           turns.end_ms, turns.start_time,
+                           snippet(turns_fts, 0, ?, ?, '...', ?)
+                    FROM turns_fts
+                    JOIN turns ON turns.id = turns_fts.rowid
+                    JOIN best ON best.id = turns_fts.rowid
+                    WHERE turns_fts MATCH ? AND best.rank <= ?
+                    ORDER BY turns.job_id, best.rank
+                    """,
+                    (
+                        expression,
+                        *job_ids,
+                        SNIPPET_START,
+                        SNIPPET_END,
+                        SNIPPET_TOKENS,
+                        expression,
+                        HITS_PER_JOB,
+                    ),
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            # Malformed boolean expressions are reported by FTS5 at query time
+            if "fts5" in str(e):
+                raise ValueError(f"Invalid search query: {str(e)}")
+            raise
+
+        results = {
+            job_id: {
+                "job_id": job_id,
+                "filename": filename,
+                # bm25() is lower for better matches
+                "score": round(-score, 4),
+                "hit_count": hit_count,
+                "hits": [],
+            }
+            for job_id, filename, score, hit_count in jobs
+        }
+        for job_id, speaker_id, start_ms, end_ms, start_time, snippet in hits:
+            results[job_id]["hits"].append(
+                {
+                    "speaker_id": speaker_id,
+                    "start_time_ms": start_ms,
+                    "end_time_ms": end_ms,
+                    "start_time": start_time,
+                    "snippet": snippet,
+                }
+            )
+        return list(results.values())
+
+
+# Create a singleton instance
+transcript_index = TranscriptIndex(
+    settings.TRANSCRIPT_INDEX_PATH, settings.TRANSCRIPT_INDEX_TOKENIZER
+)
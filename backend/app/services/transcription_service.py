@@ -1,9 +1,24 @@
 import os
 import json
-import requests
 import logging
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 from app.config import settings
+from app.models.analysis import job_db
+from app.services.job_control import job_controls
+from app.services.object_storage import storage, storage_key
+from app.services.result_store import (
+    artifact_filename,
+    encode_artifact,
+    write_artifact_file,
+)
+from app.services.rate_limiter import rate_limiter
+from app.services.transcript_index import transcript_index
+from app.utils.metrics import BYTES_UPLOADED, PROVIDER_ERRORS
+from app.utils.profiling import profile_section
+from app.utils.tracing import start_span
+
+if TYPE_CHECKING:
+    from app.services.phrase_table import PhraseTable
 
 logger = logging.getLogger(__name__)
 
@@ -27,71 +42,42 @@ def ms_to_time_format(milliseconds: int) -> str:
         return f"{minutes:02d}:{seconds:02d}"
 
 
-def create_conversation_transcript(
-    transcription_json: Dict[str, Any],
-) -> List[Dict[str, Any]]:
+def load_phrases(transcription_json: Dict[str, Any]) -> "PhraseTable":
     """
-    Creates a transcript of a multi-turn conversation, preserving the turn-taking structure.
+    Load the diarized phrases of an Azure transcription into a phrase table.
     """
+    # numpy is only needed once a transcription comes back
+    from app.services.phrase_table import PhraseTable
+
     if "phrases" not in transcription_json:
         logger.error("No phrases found in the transcription JSON")
-        return []
+        return PhraseTable.from_azure([])
+    return PhraseTable.from_azure(transcription_json["phrases"])
 
-    conversation = []
-    current_speaker = None
-    current_turn = None
-
-    # Sort phrases by their timestamp to ensure chronological order
-    phrases = sorted(
-        transcription_json["phrases"], key=lambda x: x["offsetMilliseconds"]
-    )
 
-    for phrase in phrases:
-        if "speaker" not in phrase:
-            continue
-
-        speaker_id = phrase["speaker"]
-        start_time_ms = phrase["offsetMilliseconds"]
-        end_time_ms = start_time_ms + phrase["durationMilliseconds"]
-
-        # If this is a new speaker or the first phrase
-        if speaker_id != current_speaker:
-            # Save the previous turn if it exists
-            if current_turn is not None:
-                # Join the text into a single string
-                current_turn["text"] = " ".join(current_turn["text"])
-                conversation.append(current_turn)
-
-            # Start a new turn
-            current_turn = {
-                "speaker_id": speaker_id,
-                "start_time_ms": start_time_ms,
-                "end_time_ms": end_time_ms,
-                "start_time": ms_to_time_format(start_time_ms),
-                "end_time": ms_to_time_format(end_time_ms),
-                "text": [phrase["text"]],
-                "confidence": phrase.get("confidence", 0),
-            }
-            current_speaker = speaker_id
-        else:
-            # Continue the current turn
-            current_turn["text"].append(phrase["text"])
-            current_turn["end_time_ms"] = end_time_ms
-            current_turn["end_time"] = ms_to_time_format(end_time_ms)
+def transcript_locale(transcription_json: Dict[str, Any]) -> Optional[str]:
+    """
+    The locale Azure identified for most of the speech, by phrase duration,
+    or None when the phrases carry no locale.
+    """
+    durations: Dict[str, int] = {}
+    for phrase in transcription_json.get("phrases", []):
+        locale = phrase.get("locale")
+        if locale:
+            durations[locale] = durations.get(locale, 0) + phrase.get(
+                "durationMilliseconds", 0
+            )
+    return max(durations, key=durations.get) if durations else None
 
-            # Update confidence (use average)
-            if "confidence" in phrase:
-                current_turn["confidence"] = (
-                    current_turn["confidence"] + phrase["confidence"]
-                ) / 2
 
-    # Add the last turn
-    if current_turn is not None:
-        # Join the text into a single string
-        current_turn["text"] = " ".join(current_turn["text"])
-        conversation.append(current_turn)
+def create_conversation_transcript(phrases: "PhraseTable") -> List[Dict[str, Any]]:
+    """
+    Creates a transcript of a multi-turn conversation, preserving the turn-taking structure.
 
-    return conversation
+    Consecutive phrases of a speaker are merged into one turn; the turn's
+    confidence is the duration-weighted mean of its phrases' confidences.
+    """
+    return phrases.turns().to_records()
 
 
 def format_transcript_as_string(transcript: List[Dict[str, Any]]) -> str:
@@ -110,30 +96,68 @@ def format_transcript_as_string(transcript: List[Dict[str, Any]]) -> str:
     return "\n".join(formatted_transcript)
 
 
-def process_transcript_file(transcription_result: Dict, output_file: str) -> str:
+def index_transcript(job_id: str, transcript: List[Dict[str, Any]]):
+    """
+    Add a transcript to the search index; failures are logged, not raised.
+    """
+    job = job_db.get_job(job_id)
+    try:
+        transcript_index.add_transcript(
+            job_id, transcript, job.original_filename if job else None
+        )
+    except Exception as e:
+        logger.warning(f"Failed to index transcript of job {job_id}: {str(e)}")
+
+
+def process_transcript_file(
+    transcription_result: Dict, output_file: str, job_id: str
+) -> Tuple[str, Dict[str, Any]]:
     """
     Process a transcription file and create a formatted conversation transcript.
+
+    Returns the transcript and the per-speaker statistics of the conversation,
+    which also record the conversation's main locale.
     """
+    from app.services.speaker_stats import speaker_statistics
+
+    phrases = load_phrases(transcription_result)
+
     # Create the conversation transcript
-    transcript = create_conversation_transcript(transcription_result)
+    with profile_section("create_conversation_transcript"):
+        transcript = create_conversation_transcript(phrases)
+
+    with profile_section("speaker_statistics"):
+        statistics = speaker_statistics(phrases)
+    statistics["locale"] = transcript_locale(transcription_result)
 
     # Create the string transcript
     transcript_string = format_transcript_as_string(transcript)
 
-    # Save the transcript to a file
-    with open(output_file, "w") as json_file:
-        json.dump(transcript, json_file, indent=4)
+    # Save the transcript to a compressed file
+    with profile_section("json_serialization"):
+        write_artifact_file(output_file, encode_artifact(transcript))
 
     logger.info(f"Conversation transcript saved to {output_file}")
-    return transcript_string
+
+    if settings.TRANSCRIPT_INDEX_ENABLED:
+        with profile_section("transcript_index"):
+            index_transcript(job_id, transcript)
+
+    return transcript_string, statistics
 
 
-def transcribe_audio_with_diarization(audio_file_path: str, job_id: str) -> str:
+def transcribe_audio_with_diarization(
+    audio_file_path: str, job_id: str
+) -> Tuple[str, Dict[str, Any]]:
     """
     Transcribe an audio file with speaker diarization using Azure Speech Service.
+
+    Returns the formatted transcript and the per-speaker statistics.
     """
     # Create output file path
-    output_file = os.path.join(settings.RESULTS_DIR, f"{job_id}_transcript.json")
+    output_file = os.path.join(
+        settings.RESULTS_DIR, artifact_filename(job_id, "transcript")
+    )
 
     # Get settings from config
     service_region = settings.AZURE_SERVICE_REGION
@@ -145,7 +169,11 @@ def transcribe_audio_with_diarization(audio_file_path: str, job_id: str) -> str:
     api_version = "2024-11-15"
 
     # API endpoint URL
-    url = f"https://{service_region}.api.cognitive.microsoft.com/speechtotext/transcriptions:transcribe?api-version={api_version}"
+    endpoint = (
+        settings.AZURE_SPEECH_ENDPOINT.rstrip("/")
+        or f"https://{service_region}.api.cognitive.microsoft.com"
+    )
+    url = f"{endpoint}/speechtotext/transcriptions:transcribe?api-version={api_version}"
 
     # Request headers
     headers = {"Ocp-Apim-Subscription-Key": subscription_key}
@@ -158,9 +186,12 @@ def transcribe_audio_with_diarization(audio_file_path: str, job_id: str) -> str:
         }
     )
 
+    # The session is closed if the job is cancelled or the stage deadline passes
+    control = job_controls.get(job_id)
+
     try:
         # Open the audio file
-        with open(audio_file_path, "rb") as audio_file:
+        with open(audio_file_path, "rb") as audio_file, control.http_session() as session:
             # Prepare the multipart form data
             files = {"audio": audio_file, "definition": (None, definition_str)}
 
@@ -168,7 +199,21 @@ def transcribe_audio_with_diarization(audio_file_path: str, job_id: str) -> str:
             logger.info(
                 f"Sending request to Azure Speech Service to transcribe {audio_file_path}..."
             )
-            response = requests.post(url, headers=headers, files=files)
+            file_size = os.path.getsize(audio_file_path)
+            rate_limiter.acquire("azure_requests", control=control)
+            with rate_limiter.concurrency("azure_uploads", control=control), start_span(
+                "azure.transcribe", region=service_region, bytes=file_size
+            ) as span:
+                response = session.post(
+                    url,
+                    headers=headers,
+                    files=files,
+                    timeout=settings.AZURE_REQUEST_TIMEOUT_SECONDS,
+                )
+                span.set_attribute("http.status_code", response.status_code)
+            BYTES_UPLOADED.labels("azure").inc(file_size)
+            control.record_usage(bytes_read=file_size, bytes_uploaded=file_size)
+        control.check()
 
         # Check the response
         if response.status_code == 200:
@@ -176,16 +221,24 @@ def transcribe_audio_with_diarization(audio_file_path: str, job_id: str) -> str:
             transcription_result = response.json()
 
             # Process the transcript and save to file
-            transcript_string = process_transcript_file(
-                transcription_result, output_file
+            transcript_string, statistics = process_transcript_file(
+                transcription_result, output_file, job_id
+            )
+            control.record_usage(bytes_written=os.path.getsize(output_file))
+            storage.publish(
+                storage_key("results", os.path.basename(output_file)), output_file
+            )
+            logger.info(
+                f"Transcription completed: {len(transcript_string)} characters"
             )
-            logger.info("Transcription completed:", transcript_string)
-            return transcript_string
+            return transcript_string, statistics
         else:
             error_msg = f"Transcription error: {response.status_code} - {response.text}"
             logger.error(error_msg)
             raise Exception(error_msg)
 
     except Exception as e:
+        if not control.cancelled.is_set():
+            PROVIDER_ERRORS.labels("azure", "transcribe").inc()
         logger.error(f"Error during transcription: {str(e)}")
         raise Exception(f"Failed to transcribe audio: {str(e)}")
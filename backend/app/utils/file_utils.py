@@ -1,53 +1,41 @@
 import os
-import shutil
+import asyncio
 from fastapi import UploadFile
-from pathlib import Path
 import logging
-from typing import Optional
+from typing import Tuple
+from app.utils.profiling import profile_section
 
 logger = logging.getLogger(__name__)
 
 
-async def save_uploaded_file(
-    file: UploadFile, destination_folder: Path, filename: Optional[str] = None
-) -> str:
+async def save_upload_to_storage(file: UploadFile, key: str) -> Tuple[int, str]:
     """
-    Save an uploaded file to the destination folder.
+    Stream an uploaded file to the configured storage backend.
 
     Parameters:
     -----------
     file : UploadFile
         The uploaded file
-    destination_folder : Path
-        The folder to save the file to
-    filename : Optional[str]
-        Optional custom filename, if None the original filename is used
+    key : str
+        Storage key, e.g. "videos/<job_id>.mp4"
 
     Returns:
     --------
-    str
-        The full path to the saved file
+    Tuple[int, str]
+        The size in bytes and the SHA-256 hex digest of the content
     """
-    # Make sure the destination folder exists
-    os.makedirs(destination_folder, exist_ok=True)
+    from app.services.object_storage import storage
 
-    # Determine the filename
-    if filename:
-        dest_filename = filename
-    else:
-        dest_filename = file.filename
-
-    # Full path to destination
-    file_path = os.path.join(destination_folder, dest_filename)
+    def write() -> Tuple[int, str]:
+        # Profiled in the thread that does the work, not on the event loop
+        with profile_section("save_upload_to_storage"):
+            return storage.save_stream(key, file.file)
 
     try:
-        # Create a buffer to store the file
-        with open(file_path, "wb") as buffer:
-            # Copy the uploaded file to the buffer
-            shutil.copyfileobj(file.file, buffer)
-
-        logger.info(f"File saved successfully: {file_path}")
-        return file_path
+        # Runs in a thread so slow disks or object stores do not block the loop
+        size, digest = await asyncio.to_thread(write)
+        logger.info(f"File saved successfully: {key} ({size} bytes)")
+        return size, digest
 
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
@@ -0,0 +1,178 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from app.config import settings
+
+# Job whose code is logging; copied into worker threads by run_stage
+job_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "job_id", default=None
+)
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "job_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def job_log_context(job_id: str) -> Iterator[None]:
+    """Tag every record logged inside the block with ``job_id``."""
+    token = job_id_var.set(job_id)
+    try:
+        yield
+    finally:
+        job_id_var.reset(token)
+
+
+def truncate(value: str, limit: int) -> str:
+    if len(value) <= limit:
+        return value
+    return f"{value[:limit]}... [{len(value) - limit} characters truncated]"
+
+
+class JobContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "job_id"):
+            record.job_id = job_id_var.get()
+        return True
+
+
+class NonFormattingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records as they are, leaving message formatting to the listener.
+
+    The stock ``prepare`` formats every record in the calling thread so it
+    can be pickled; the queue here never leaves the process.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with long values cut to ``max_field_chars``."""
+
+    def __init__(self, max_field_chars: int):
+        super().__init__()
+        self.max_field_chars = max_field_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage(), self.max_field_chars),
+        }
+        if getattr(record, "job_id", None):
+            entry["job_id"] = record.job_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                if not isinstance(value, (int, float, bool)) and value is not None:
+                    value = truncate(str(value), self.max_field_chars)
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = truncate(
+                self.formatException(record.exc_info), self.max_field_chars * 4
+            )
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, max_field_chars: int):
+        super().__init__(
+            "%(asctime)s - %(name)s - %(levelname)s - %(job_prefix)s%(message)s"
+        )
+        self.max_field_chars = max_field_chars
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        job_id = getattr(record, "job_id", None)
+        record.job_prefix = f"[{job_id}] " if job_id else ""
+        record.message = truncate(record.message, self.max_field_chars)
+        return super().formatMessage(record)
+
+
+def parse_log_levels(value: str) -> Dict[str, str]:
+    """Parse "logger=LEVEL,other.logger=LEVEL" into a dict."""
+    levels = {}
+    for entry in value.split(","):
+        name, _, level = entry.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "text":
+        return TextFormatter(settings.LOG_MAX_FIELD_CHARS)
+    return JsonFormatter(settings.LOG_MAX_FIELD_CHARS)
+
+
+def _install_root_handler(root: logging.Logger, handler: logging.Handler):
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in parse_log_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+
+def setup_logging():
+    """
+    Send all records through an in-memory queue to a background listener
+    that writes them to stderr and a size-rotated log file.
+
+    Callers only pay for creating the record; formatting and file I/O happen
+    on the listener thread. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = _formatter()
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if settings.LOG_FILE:
+        handlers.append(
+            logging.handlers.RotatingFileHandler(
+                settings.LOG_FILE,
+                maxBytes=settings.LOG_FILE_MAX_BYTES,
+                backupCount=settings.LOG_FILE_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = NonFormattingQueueHandler(log_queue)
+    # Runs in the logging thread, where the job context is still set
+    queue_handler.addFilter(JobContextFilter())
+
+    _install_root_handler(logging.getLogger(), queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def setup_worker_logging():
+    """
+    Log from a worker process straight to stderr.
+
+    Only the API process writes the rotating log file, which is not safe to
+    share between processes.
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(_formatter())
+    handler.addFilter(JobContextFilter())
+    _install_root_handler(logging.getLogger(), handler)
@@ -0,0 +1,74 @@
+import logging
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages run from seconds (upload write) to tens of minutes (Gemini video)
+STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+STAGE_DURATION = Histogram(
+    "interview_stage_duration_seconds",
+    "Time spent in each processing stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+PROVIDER_ERRORS = Counter(
+    "interview_provider_errors_total",
+    "Failed calls to external providers",
+    ["provider", "operation"],
+)
+PROVIDER_RETRIES = Counter(
+    "interview_provider_retries_total",
+    "Provider calls repeated after an earlier attempt failed",
+    ["provider", "operation"],
+)
+PROVIDER_TOKENS = Counter(
+    "interview_provider_tokens_total",
+    "Tokens reported by Gemini responses",
+    ["stage", "kind"],
+)
+QUEUE_DEPTH = Gauge("interview_queue_depth", "Jobs waiting for a pipeline slot")
+IN_FLIGHT_JOBS = Gauge("interview_in_flight_jobs", "Jobs currently running a pipeline")
+JOBS_FINISHED = Counter(
+    "interview_jobs_finished_total", "Jobs that reached a final status", ["status"]
+)
+BYTES_UPLOADED = Counter(
+    "interview_bytes_uploaded_total",
+    "Bytes received from clients or sent to providers",
+    ["destination"],
+)
+BYTES_SERVED = Counter(
+    "interview_bytes_served_total", "Response bytes sent to clients", ["route"]
+)
+STORAGE_FILES_REMOVED = Counter(
+    "interview_storage_files_removed_total",
+    "Files deleted by the storage lifecycle manager",
+    ["kind"],
+)
+DISK_FREE_BYTES = Gauge("interview_disk_free_bytes", "Free space on the upload volume")
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Record how long the enclosed block takes in the stage duration histogram.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def provider_call(provider: str, operation: str):
+    """
+    Count a provider call as an error if the enclosed block raises.
+    """
+    try:
+        yield
+    except Exception:
+        PROVIDER_ERRORS.labels(provider, operation).inc()
+        raise
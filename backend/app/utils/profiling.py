@@ -0,0 +1,272 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Profile of the job whose code is running; copied into worker threads by run_stage
+active_profile: contextvars.ContextVar[Optional["JobProfile"]] = (
+    contextvars.ContextVar("active_profile", default=None)
+)
+
+# Number of stacks and allocation sites kept in the JSON summary
+TOP_ENTRIES = 50
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler sampling the stacks of selected threads.
+
+    A background thread reads ``sys._current_frames()`` every interval and
+    counts the stacks of the threads currently registered, so the cost is
+    independent of how much Python code the profiled threads execute.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._threads: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add_thread(self, ident: int):
+        with self._lock:
+            self._threads[ident] += 1
+
+    def remove_thread(self, ident: int):
+        with self._lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            with self._lock:
+                idents = list(self._threads)
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[self._fold(frame)] += 1
+                    self.samples += 1
+
+    @staticmethod
+    def _fold(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            names.append(f"{code.co_name} ({filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def folded(self) -> str:
+        """Stacks in the folded format read by flamegraph tools."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+class JobProfile:
+    """
+    CPU samples, allocation growth and section timings collected for one job.
+
+    Allocation growth comes from tracemalloc, which is process-wide: it also
+    counts memory allocated by other jobs running at the same time.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.started_at = time.time()
+        self.sections: Dict[str, Dict[str, float]] = {}
+        self.sampler = SamplingProfiler(settings.PROFILING_SAMPLE_INTERVAL_SECONDS)
+        self._lock = threading.Lock()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._finished = False
+
+    def start(self):
+        _start_tracemalloc()
+        self._snapshot = tracemalloc.take_snapshot()
+        self.sampler.start()
+
+    def record_section(self, name: str, wall_seconds: float, cpu_seconds: float):
+        with self._lock:
+            section = self.sections.setdefault(
+                name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+            )
+            section["calls"] += 1
+            section["wall_seconds"] += wall_seconds
+            section["cpu_seconds"] += cpu_seconds
+
+    def finish(self, output_dir: str) -> Optional[str]:
+        """
+        Stop collecting and write the profile; returns the JSON file path.
+        """
+        with self._lock:
+            if self._finished:
+                return None
+            self._finished = True
+
+        self.sampler.stop()
+        allocations = []
+        if self._snapshot is not None:
+            snapshot = tracemalloc.take_snapshot()
+            _stop_tracemalloc()
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[:TOP_ENTRIES]:
+                allocations.append(
+                    {
+                        "location": str(stat.traceback),
+                        "size_diff_bytes": stat.size_diff,
+                        "count_diff": stat.count_diff,
+                    }
+                )
+
+        summary = {
+            "job_id": self.job_id,
+            "duration_seconds": round(time.time() - self.started_at, 3),
+            "sample_interval_seconds": self.sampler.interval_seconds,
+            "samples": self.sampler.samples,
+            "sections": self.sections,
+            "top_stacks": [
+                {"stack": stack, "samples": count}
+                for stack, count in self.sampler.stacks.most_common(TOP_ENTRIES)
+            ],
+            "allocations": allocations,
+        }
+
+        json_path = profile_path(output_dir, self.job_id)
+        with open(json_path, "w") as f:
+            json.dump(summary, f, indent=4)
+        with open(folded_profile_path(output_dir, self.job_id), "w") as f:
+            f.write(self.sampler.folded())
+        logger.info(f"Profile of job {self.job_id} written to {json_path}")
+        return json_path
+
+
+def profile_path(output_dir: str, job_id: str) -> str:
+    return os.path.join(output_dir, f"{job_id}_profile.json")
+
+
+def folded_profile_path(output_dir: str, job_id: str) -> str:
+    return os.path.join(output_dir, f"{job_id}_profile.folded")
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block and sample the current thread while it runs.
+
+    Does nothing unless the current job is being profiled.
+    """
+    profile = active_profile.get()
+    if profile is None:
+        yield
+        return
+
+    ident = threading.get_ident()
+    profile.sampler.add_thread(ident)
+    wall_started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield
+    finally:
+        profile.record_section(
+            name,
+            time.perf_counter() - wall_started,
+            time.thread_time() - cpu_started,
+        )
+        profile.sampler.remove_thread(ident)
+
+
+@asynccontextmanager
+async def profile_job(job_id: str) -> AsyncIterator[None]:
+    """
+    Run a job's pipeline under its profile, if one was requested, and write
+    the profile next to the job results when the pipeline ends.
+
+    Only the pipeline's worker-thread sections are sampled: the event loop
+    interleaves every running job, so its stacks cannot be attributed to one.
+    """
+    profile = job_profiles.get(job_id)
+    if profile is None:
+        yield
+        return
+
+    token = active_profile.set(profile)
+    try:
+        yield
+    finally:
+        active_profile.reset(token)
+        # Comparing allocation snapshots and writing files would block the loop
+        await asyncio.to_thread(job_profiles.finish, job_id, settings.RESULTS_DIR)
+
+
+class JobProfileRegistry:
+    def __init__(self):
+        self.profiles: Dict[str, JobProfile] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str) -> JobProfile:
+        profile = JobProfile(job_id)
+        profile.start()
+        with self._lock:
+            self.profiles[job_id] = profile
+        logger.info(f"Profiling job {job_id}")
+        return profile
+
+    def get(self, job_id: str) -> Optional[JobProfile]:
+        with self._lock:
+            return self.profiles.get(job_id)
+
+    def finish(self, job_id: str, output_dir: Any) -> Optional[str]:
+        with self._lock:
+            profile = self.profiles.pop(job_id, None)
+        if profile is None:
+            return None
+        return profile.finish(str(output_dir))
+
+
+# Create a singleton instance
+job_profiles = JobProfileRegistry()
@@ -0,0 +1,168 @@
+import json
+import math
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used for local token estimates
+CHARS_PER_TOKEN = 4
+# Share of the budget kept for the most recent turns, which stay verbatim
+RECENT_TURNS_BUDGET_SHARE = 0.5
+# Older turns are merged in groups of this size at the second summary level
+SUMMARY_GROUP_SIZE = 4
+SUMMARY_WORDS_PER_TURN = 12
+
+# English hesitation sounds; only stripped from English transcripts, since
+# syllables like "ah" or "eh" are real words or particles in other languages
+FILLER_PATTERN = re.compile(
+    r"\b(?:u+m+|u+h+|uhm|e+r+m+|h+m+)\b[,.]?\s*", re.IGNORECASE
+)
+# Words a speaker stutters ("I I think", "the the"); words that are often
+# legitimately doubled, such as "had had" or "that that", are left alone
+STUTTER_WORDS = "i a an the and but so to of in on it we you my like".split()
+REPEATED_WORD_PATTERN = re.compile(
+    r"\b(" + "|".join(STUTTER_WORDS) + r")(?:\s+\1\b)+", re.IGNORECASE
+)
+TURN_PATTERN = re.compile(r'^(speaker [^:]+): "(.*)"$')
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text without calling the provider.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact_json(obj: Any) -> str:
+    """
+    Serialize an object as JSON without indentation or extra whitespace.
+    """
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def is_english(locale: Optional[str]) -> bool:
+    return bool(locale) and locale.lower().startswith("en")
+
+
+def _clean_text(text: str, english: bool) -> str:
+    if english:
+        text = FILLER_PATTERN.sub("", text)
+        text = REPEATED_WORD_PATTERN.sub(r"\1", text)
+    return re.sub(r"\s{2,}", " ", text).strip()
+
+
+def _clean_turn(line: str, english: bool) -> str:
+    match = TURN_PATTERN.match(line)
+    if not match:
+        return _clean_text(line, english)
+    speaker, text = match.groups()
+    text = _clean_text(text, english)
+    return f'{speaker}: "{text}"' if text else ""
+
+
+def _first_sentence(line: str) -> str:
+    match = TURN_PATTERN.match(line)
+    if not match:
+        return line
+    speaker, text = match.groups()
+    sentences = SENTENCE_END_PATTERN.split(text, maxsplit=1)
+    if len(sentences) == 1:
+        return line
+    return f'{speaker}: "{sentences[0]} ..."'
+
+
+def _first_sentences(lines: List[str]) -> List[str]:
+    return [_first_sentence(line) for line in lines]
+
+
+def _merge_turn_groups(lines: List[str]) -> List[str]:
+    merged = []
+    for start in range(0, len(lines), SUMMARY_GROUP_SIZE):
+        parts = []
+        for line in lines[start : start + SUMMARY_GROUP_SIZE]:
+            match = TURN_PATTERN.match(line)
+            speaker, text = match.groups() if match else ("", line)
+            words = text.split()
+            snippet = " ".join(words[:SUMMARY_WORDS_PER_TURN])
+            if len(words) > SUMMARY_WORDS_PER_TURN:
+                snippet += " ..."
+            parts.append(f"{speaker}: {snippet}" if speaker else snippet)
+        merged.append(f"[summary] {'; '.join(parts)}")
+    return merged
+
+
+def _fit_older_turns(lines: List[str], token_budget: int) -> List[str]:
+    """
+    Summarize older turns level by level until the transcript fits the budget.
+
+    The most recent turns are kept verbatim. Older turns are first cut to their
+    first sentence, then merged into short group summaries, and finally the
+    oldest summaries are dropped.
+    """
+    recent_budget = int(token_budget * RECENT_TURNS_BUDGET_SHARE)
+    recent: List[str] = []
+    used = 0
+    for line in reversed(lines):
+        tokens = estimate_tokens(line) + 1
+        if recent and used + tokens > recent_budget:
+            break
+        recent.insert(0, line)
+        used += tokens
+
+    older = lines[: len(lines) - len(recent)]
+
+    def fits(candidate: List[str]) -> bool:
+        return estimate_tokens("\n".join(candidate + recent)) <= token_budget
+
+    for summarize in (_first_sentences, _merge_turn_groups):
+        if fits(older):
+            return older + recent
+        older = summarize(older)
+
+    dropped = 0
+    while older and not fits(older):
+        older.pop(0)
+        dropped += 1
+    if dropped:
+        older.insert(0, f"[... {dropped} earlier summary lines omitted ...]")
+    return older + recent
+
+
+def compact_transcript(
+    transcript: str, token_budget: int, locale: Optional[str] = None
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Compact a formatted transcript so it fits within a token budget.
+
+    Duplicate consecutive turns are always removed; English filler sounds and
+    stuttered short words only when ``locale`` is an English one. Older turns
+    are only summarized when the transcript is still over ``token_budget`` (a
+    budget of 0 disables summarization).
+
+    Returns the compacted transcript and its token counts before and after.
+    """
+    original_tokens = estimate_tokens(transcript)
+
+    english = is_english(locale)
+    lines: List[str] = []
+    for line in transcript.splitlines():
+        line = _clean_turn(line, english)
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+
+    if token_budget and estimate_tokens("\n".join(lines)) > token_budget:
+        lines = _fit_older_turns(lines, token_budget)
+
+    compacted = "\n".join(lines)
+    stats = {
+        "original_tokens": original_tokens,
+        "compacted_tokens": estimate_tokens(compacted),
+    }
+    logger.info(
+        f"Transcript compacted from {stats['original_tokens']} to "
+        f"{stats['compacted_tokens']} estimated tokens"
+    )
+    return compacted, stats
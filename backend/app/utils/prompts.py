@@ -5,11 +5,6 @@ VIDEO_ANALYSIS_SYSTEM_PROMPT = """When given a video and a query, call the relev
 VIDEO_ANALYSIS_USER_PROMPT = """
 You are tasked with analyzing an **online interview video** of a candidate. **Your goal is to analyze the candidate's behavior, communication, and emotional expressions** based on the provided video transcript.
 
-Here is the **transcript of the video**:  
-<Transcript>  
-{transcript}  
-</Transcript>  
-
 ### Instructions:  
 1. The video may contain **both the candidate and the interviewer**.
 2. The language of the video may be **English** or **thai**.
@@ -60,6 +55,11 @@ IMPORTANT NOTES:
     - For each section, provide examples with time code from the interview video
     - The language of the Video may be **English** or **thai**
     - Try to understand the language of the video and provide the correct analysis.
+
+Here is the **transcript of the video**:  
+<Transcript>  
+{transcript}  
+</Transcript>  
 """
 
 
@@ -72,11 +72,7 @@ Try to understand the language of the transcript and provide the correct analysi
 """
 
 
-SCORING_USER_PROMPT = """
-You are a hiring manager and need to evaluate and score the candidate based on their **online interview performance**.  
-Your goal is to **fairly and professionally assess the candidate's communication, behavior, and suitability for the role**, using the **transcript and the video/audio analysis report**.  
-
----
+SCORING_CRITERIA = """---
 
 ### **Evaluation Criteria (Refined and Non-Overlapping):**
 
@@ -123,7 +119,17 @@ Your goal is to **fairly and professionally assess the candidate's communication
 
 ---
 
-### **Response Format (JSON):**
+"""
+
+
+SCORING_USER_PROMPT = (
+    """
+You are a hiring manager and need to evaluate and score the candidate based on their **online interview performance**.  
+Your goal is to **fairly and professionally assess the candidate's communication, behavior, and suitability for the role**, using the **transcript and the video/audio analysis report**.  
+
+"""
+    + SCORING_CRITERIA
+    + """### **Response Format (JSON):**
 
 ```json
 {{
@@ -135,6 +141,16 @@ Your goal is to **fairly and professionally assess the candidate's communication
 }}
 ```
 
+### Important Notes:
+    - Review the transcript and video/audio analysis report carefully.
+    - The report's `speaker_statistics` are measured from the diarized audio (talk ratio, words per minute, pauses, response latency, interruptions, longest monologue); treat them as exact and prefer them over impressions of pace and turn-taking.
+    - When present, the report's `frame_statistics` are measured from sampled video frames (face presence, time off screen, head and overall motion); use them as supporting evidence for non-verbal behaviour.
+    - Ensure each score is fully justified based on clear observations.
+    - Be detailed in your reasoning — highlight both strengths and weaknesses where relevant.
+    - Maintain a neutral and professional tone.
+    - Not necessary to mention information from transcripts and video/audio analysis report in the scores, give reason based on the information provided.
+    - Remember: 0 is the lowest score (Very Poor), 10 is the highest (Excellent).
+
 Rate the candidate based on the following transcript and the video and audio analysis report.
 <Transcript>
 {transcript}
@@ -142,15 +158,56 @@ Rate the candidate based on the following transcript and the video and audio ana
 <Video and Audio Analysis Report>
 {video_and_audio_analysis_report}
 </Video and Audio Analysis Report>
+"""
+)
+
+
+BATCH_SCORING_USER_PROMPT = (
+    """
+You are a hiring manager and need to evaluate and score **several candidates independently** based on their **online interview performance**.
+Each candidate is given in its own `<Candidate>` block with its own transcript and video/audio analysis report.
+Your goal is to **fairly and professionally assess each candidate's communication, behavior, and suitability for the role**, using **only the information inside that candidate's block**.
+
+"""
+    + SCORING_CRITERIA
+    + """### **Response Format (JSON):**
+
+Return a JSON array with exactly one object per `<Candidate>` block:
+
+```json
+[
+    {{
+        "candidate_id": "The id attribute of the <Candidate> block",
+        "verbal_communication_score": ["Reason for the score", 0-10],
+        "non_verbal_communication_and_body_language_score": ["Reason for the score", 0-10],
+        "emotional_and_vocal_tone_analysis_score": ["Reason for the score", 0-10],
+        "skills_experience_professional_competence_score": ["Reason for the score", 0-10],
+        "motivation_adaptability_professional_attitude_score": ["Reason for the score", 0-10]
+    }}
+]
+```
 
 ### Important Notes:
-    - Review the transcript and video/audio analysis report carefully.
+    - Score every candidate on its own — never compare candidates or mix information between blocks.
+    - Copy each `candidate_id` exactly as it appears in the `<Candidate>` block.
+    - Each report's `speaker_statistics` are measured from the diarized audio; treat them as exact and prefer them over impressions of pace and turn-taking.
     - Ensure each score is fully justified based on clear observations.
-    - Be detailed in your reasoning — highlight both strengths and weaknesses where relevant.
     - Maintain a neutral and professional tone.
-    - Not necessary to mention information from transcripts and video/audio analysis report in the scores, give reason based on the information provided.
     - Remember: 0 is the lowest score (Very Poor), 10 is the highest (Excellent).
+
+Rate each of the following candidates.
+{candidates}
 """
+)
+
+BATCH_SCORING_CANDIDATE_TEMPLATE = """<Candidate id="{candidate_id}">
+<Transcript>
+{transcript}
+</Transcript>
+<Video and Audio Analysis Report>
+{video_and_audio_analysis_report}
+</Video and Audio Analysis Report>
+</Candidate>"""
 AUDIO_SYSTEM_PROMPT = """Given the audio file do speaker diarization and return the transcript with speaker id. Identify the language of the audio file and return the transcript in the same language. the output should be in string format."""
 AUDIO_USER_PROMPT = """
 give me the transcript of the audio file.
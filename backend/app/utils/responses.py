@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Only gzip is offered without brotli
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize models, lists of models and plain values to JSON bytes."""
+    if isinstance(content, BaseModel):
+        content = content.model_dump(mode="json")
+    elif isinstance(content, list) and content and isinstance(content[0], BaseModel):
+        content = [item.model_dump(mode="json") for item in content]
+    if orjson:
+        return orjson.dumps(content, default=jsonable_encoder)
+    return json.dumps(
+        jsonable_encoder(content), separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def negotiate_encoding(request: Request) -> Optional[str]:
+    """Pick brotli or gzip from the request's Accept-Encoding, if either."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                pass
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    if brotli and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def etag_for(data: bytes) -> str:
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak validators ("W/...") compare equal to strong ones for GET
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+@dataclass
+class EncodedBody:
+    """A JSON body with its compressed variants, computed on first use."""
+
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def for_encoding(self, encoding: Optional[str]) -> bytes:
+        if encoding is None or len(self.body) < MIN_COMPRESS_BYTES:
+            return self.body
+        if encoding not in self.encoded:
+            self.encoded[encoding] = compress(self.body, encoding)
+        return self.encoded[encoding]
+
+
+def _validator_headers(etag: str, cache_control: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+
+def not_modified(etag: str, cache_control: str = "no-cache") -> Response:
+    return Response(status_code=304, headers=_validator_headers(etag, cache_control))
+
+
+def encoded_response(
+    request: Request,
+    encoded: EncodedBody,
+    cache_control: str = "no-cache",
+) -> Response:
+    """
+    Serve ``encoded`` with ETag revalidation and negotiated compression.
+    """
+    if etag_matches(request, encoded.etag):
+        return not_modified(encoded.etag, cache_control)
+
+    headers = _validator_headers(encoded.etag, cache_control)
+    encoding = negotiate_encoding(request)
+    body = encoded.for_encoding(encoding)
+    if body is not encoded.body:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(request: Request, content: Any) -> Response:
+    """Serialize ``content`` and serve it with ``encoded_response``."""
+    body = dump_json(content)
+    return encoded_response(request, EncodedBody(body=body, etag=etag_for(body)))
+
+
+class EncodedBodyCache:
+    """
+    Bounded LRU of pre-serialized, pre-compressed bodies of immutable
+    resources. Entries are keyed by their ETag unless a separate key is given,
+    in which case an entry is only reused while its ETag still matches.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, EncodedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, etag: str, build: Callable[[], bytes], key: Optional[str] = None
+    ) -> EncodedBody:
+        key = key or etag
+        with self._lock:
+            encoded = self.entries.get(key)
+            if encoded is not None and encoded.etag == etag:
+                self.entries.move_to_end(key)
+                return encoded
+
+        encoded = EncodedBody(body=build(), etag=etag)
+        # Compress up front so later requests only copy bytes
+        for encoding in ("br", "gzip") if brotli else ("gzip",):
+            encoded.for_encoding(encoding)
+        with self._lock:
+            self.entries[key] = encoded
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return encoded
+
+    def discard(self, key: str):
+        with self._lock:
+            self.entries.pop(key, None)
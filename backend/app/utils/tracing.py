@@ -0,0 +1,117 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:  # Tracing is optional
+    trace = None
+
+_setup_lock = threading.Lock()
+_tracer = None
+
+
+class _NoopSpan:
+    """Stand-in span used when tracing is disabled or not installed"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _create_exporter():
+    exporter = settings.TRACING_EXPORTER
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if exporter == "console":
+        return ConsoleSpanExporter()
+
+    # One JSON span per line, readable without a collector
+    return ConsoleSpanExporter(
+        out=open(settings.TRACING_FILE_PATH, "a"),
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+
+
+def setup_tracing(service_name: Optional[str] = None):
+    """
+    Install the tracer provider and exporter configured in settings.
+
+    Safe to call from both the API and Celery worker processes; does nothing
+    when tracing is disabled or OpenTelemetry is not installed.
+    """
+    global _tracer
+    if not settings.TRACING_ENABLED:
+        return
+    if trace is None:
+        logger.warning("TRACING_ENABLED is set but opentelemetry is not installed")
+        return
+
+    with _setup_lock:
+        if _tracer is not None:
+            return
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            provider = TracerProvider(
+                resource=Resource.create(
+                    {"service.name": service_name or settings.TRACING_SERVICE_NAME}
+                )
+            )
+            provider.add_span_processor(BatchSpanProcessor(_create_exporter()))
+            trace.set_tracer_provider(provider)
+            _tracer = trace.get_tracer("interview-analysis")
+            logger.info(f"Tracing enabled with {settings.TRACING_EXPORTER} exporter")
+        except Exception as e:
+            logger.error(f"Failed to set up tracing: {str(e)}")
+
+
+@contextmanager
+def start_span(
+    name: str, carrier: Optional[Dict[str, str]] = None, **attributes: Any
+) -> Iterator[Any]:
+    """
+    Run the enclosed block in a span, optionally continuing a propagated trace.
+
+    Attributes set to None are skipped. Exceptions are recorded on the span
+    and re-raised.
+    """
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+
+    parent = propagate.extract(carrier) if carrier else None
+    with _tracer.start_as_current_span(
+        name, context=parent, record_exception=True, set_status_on_exception=True
+    ) as span:
+        span.set_attributes({k: v for k, v in attributes.items() if v is not None})
+        yield span
+
+
+def inject_context() -> Dict[str, str]:
+    """
+    Serialize the current trace context so another task or process can join it.
+    """
+    carrier: Dict[str, str] = {}
+    if _tracer is not None:
+        propagate.inject(carrier)
+    return carrier
+
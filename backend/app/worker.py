@@ -1,6 +1,8 @@
 from celery import Celery
 import os
+from typing import Dict, Optional
 from app.models.analysis import job_db, ProcessingStatus
+from app.utils.tracing import setup_tracing, start_span
 import logging
 
 # Configure logging
@@ -22,10 +24,18 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
 )
 
+setup_tracing(service_name="interview-analysis-worker")
+
 
 # Define the video processing task
 @celery_app.task(bind=True, name="process_video")
-def process_video_task(self, job_id: str, video_path: str, filename: str):
+def process_video_task(
+    self,
+    job_id: str,
+    video_path: str,
+    filename: str,
+    trace_context: Optional[Dict[str, str]] = None,
+):
     """Process a video in a separate worker process"""
     logger.info(f"Starting processing for job {job_id}")
 
@@ -38,8 +48,14 @@ def process_video_task(self, job_id: str, video_path: str, filename: str):
         if job:
             job.celery_task_id = self.request.id
 
-        # Process the video
-        process_video_job_sync(job_id)
+        # Process the video, continuing the trace of the enqueuing request
+        with start_span(
+            "process_video_task",
+            carrier=trace_context,
+            job_id=job_id,
+            celery_task_id=self.request.id,
+        ):
+            process_video_job_sync(job_id)
 
         logger.info(f"Completed processing for job {job_id}")
         return {"status": "success", "job_id": job_id}
@@ -0,0 +1,100 @@
+"""
+Check that importing the API stays within a startup time budget.
+
+Run from the backend directory:
+
+    python -m benchmarks.import_budget --budget-ms 750
+
+Imports ``app.main`` in fresh interpreters with ``-X importtime``, reports the
+best cumulative import time and the slowest top-level packages, and exits
+non-zero when the budget is exceeded or a dependency that should load lazily
+(Gemini SDK, moviepy and its imaging stack, OpenCV) is imported at startup.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported on first use only; loading them at startup is a regression
+LAZY_MODULES = ["google.genai", "moviepy", "numpy", "PIL", "imageio", "cv2"]
+
+
+def measure_import(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import ``module`` in a fresh interpreter; return its cumulative import
+    time and the cumulative time of each top-level package, in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_ms = 0.0
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        indent = len(name) - len(name.lstrip())
+        name = name.strip()
+        cumulative_ms = int(cumulative) / 1000
+        if name == module:
+            total_ms = cumulative_ms
+        elif indent <= 3:
+            packages[name] = cumulative_ms
+    return total_ms, packages
+
+
+def loaded_lazy_modules(module: str) -> List[str]:
+    code = (
+        "import json, sys; "
+        f"import {module}; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=750.0)
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Best of this many interpreters"
+    )
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    total_ms, packages = min(runs, key=lambda run: run[0])
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, cumulative_ms in sorted(
+        packages.items(), key=lambda item: item[1], reverse=True
+    )[:10]:
+        print(f"  {cumulative_ms:8.1f} ms  {name}")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print("Import time exceeds the budget")
+        failed = True
+    loaded = loaded_lazy_modules(args.module)
+    if loaded:
+        print(f"Imported at startup but expected lazily: {', '.join(loaded)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
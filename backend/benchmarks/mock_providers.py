@@ -0,0 +1,382 @@
+"""
+Local stand-in for the Azure fast-transcription and Gemini APIs.
+
+Point the backend at it with:
+
+    AZURE_SPEECH_ENDPOINT=http://127.0.0.1:9100
+    GEMINI_BASE_URL=http://127.0.0.1:9100
+
+Latency, throttling (HTTP 429) and failure (HTTP 500) rates are configurable
+per provider, so benchmarks can exercise the pipeline without provider quota.
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCORE_FIELDS = (
+    "verbal_communication_score",
+    "non_verbal_communication_and_body_language_score",
+    "emotional_and_vocal_tone_analysis_score",
+    "skills_experience_professional_competence_score",
+    "motivation_adaptability_professional_attitude_score",
+)
+# Matched against the JSON-encoded request, where the quotes are escaped
+CANDIDATE_ID_PATTERN = re.compile(r'<Candidate id=\\"([^"\\]+)\\">')
+
+
+@dataclass
+class ProviderBehaviour:
+    """How one emulated provider responds"""
+
+    latency_seconds: float = 0.5
+    # Extra latency per MB of request body (uploads, audio)
+    latency_per_mb_seconds: float = 0.0
+    # Sustained requests per second before answering 429 (0 = never throttle)
+    max_requests_per_second: float = 0.0
+    failure_rate: float = 0.0
+    _window: list = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def throttled(self) -> bool:
+        if not self.max_requests_per_second:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.max_requests_per_second:
+                return True
+            self._window.append(now)
+            return False
+
+    def delay(self, body_bytes: int):
+        time.sleep(
+            self.latency_seconds
+            + self.latency_per_mb_seconds * body_bytes / (1024 * 1024)
+        )
+
+    def fails(self) -> bool:
+        return random.random() < self.failure_rate
+
+
+@dataclass
+class MockState:
+    azure: ProviderBehaviour
+    gemini: ProviderBehaviour
+    # Seconds an uploaded Gemini file stays PROCESSING
+    file_processing_seconds: float = 0.0
+    # Phrases in each emulated transcript
+    transcript_phrases: int = 40
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    uploads: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def count(self, name: str):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def fake_transcription(phrases: int) -> Dict[str, Any]:
+    """An Azure fast-transcription response with two alternating speakers."""
+    offset = 0
+    result = []
+    for index in range(phrases):
+        duration = random.randint(1500, 6000)
+        result.append(
+            {
+                "speaker": 1 + (index // 2) % 2,
+                "offsetMilliseconds": offset,
+                "durationMilliseconds": duration,
+                "text": f"This is synthetic phrase number {index} of the interview.",
+                "confidence": round(random.uniform(0.8, 0.99), 3),
+            }
+        )
+        offset += duration + random.randint(100, 800)
+    return {"durationMilliseconds": offset, "phrases": result}
+
+
+def fake_generation(request: Dict[str, Any]) -> Any:
+    """Answer a generateContent request in the shape its prompt asks for."""
+    text = json.dumps(request)
+    if "candidate_id" in text:
+        return [
+            {"candidate_id": candidate_id, **_fake_scores()}
+            for candidate_id in CANDIDATE_ID_PATTERN.findall(text)
+        ]
+    if "verbal_communication_score" in text:
+        return _fake_scores()
+    if "non_verbal_communication_and_body_language" in text:
+        return {
+            "verbal_communication": "Clear and structured answers.",
+            "non_verbal_communication_and_body_language": "Steady eye contact.",
+            "emotional_and_vocal_tone_analysis": "Calm and confident tone.",
+        }
+    return "speaker 1: synthetic transcript"
+
+
+def _fake_scores() -> Dict[str, Any]:
+    return {
+        name: {"reason": "Synthetic benchmark score.", "score": random.randint(4, 9)}
+        for name in SCORE_FIELDS
+    }
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    server_version = "MockProviders/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> MockState:
+        return self.server.state
+
+    def log_message(self, format: str, *args):
+        logger.debug(format % args)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(
+        self,
+        status: int,
+        payload: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        body = json.dumps(payload if payload is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _gate(self, behaviour: ProviderBehaviour, name: str, body_bytes: int) -> bool:
+        """Apply throttling, latency and failures; False if already answered."""
+        self.state.count(f"{name}_requests")
+        if behaviour.throttled():
+            self.state.count(f"{name}_throttled")
+            self._send(
+                429,
+                {"error": {"code": 429, "message": "Rate limit exceeded"}},
+                {"Retry-After": "1"},
+            )
+            return False
+        behaviour.delay(body_bytes)
+        if behaviour.fails():
+            self.state.count(f"{name}_failed")
+            self._send(500, {"error": {"code": 500, "message": "Injected failure"}})
+            return False
+        return True
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split("?", 1)[0]
+
+        if path.endswith("/speechtotext/transcriptions:transcribe"):
+            if self._gate(self.state.azure, "azure", len(body)):
+                self._send(200, fake_transcription(self.state.transcript_phrases))
+        elif path.endswith("/upload/v1beta/files"):
+            self._start_upload(body)
+        elif path.startswith("/upload-session/"):
+            self._upload_chunk(path.rsplit("/", 1)[-1], body)
+        elif path.endswith(":generateContent"):
+            if self._gate(self.state.gemini, "gemini", len(body)):
+                self._generate(json.loads(body or b"{}"))
+        elif path.endswith("/cachedContents"):
+            self._create_cache(json.loads(body or b"{}"))
+        else:
+            self._send(404, {"error": {"code": 404, "message": path}})
+
+    def do_GET(self):
+        name = self.path.split("?", 1)[0].split("/v1beta/", 1)[-1]
+        file_record = self._file(name)
+        if file_record is None:
+            self._send(404, {"error": {"code": 404, "message": name}})
+        else:
+            self._send(200, file_record)
+
+    def do_DELETE(self):
+        name = self.path.split("?", 1)[0].split("/v1beta/", 1)[-1]
+        with self.state.lock:
+            self.state.files.pop(name, None)
+        self._send(200, {})
+
+    def _start_upload(self, body: bytes):
+        request = json.loads(body or b"{}").get("file", {})
+        session_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.uploads[session_id] = {
+                "mime_type": request.get("mimeType", "video/mp4"),
+                "received": 0,
+            }
+        host = self.headers.get("Host", "127.0.0.1")
+        self._send(
+            200,
+            {},
+            {"X-Goog-Upload-URL": f"http://{host}/upload-session/{session_id}"},
+        )
+
+    def _upload_chunk(self, session_id: str, body: bytes):
+        with self.state.lock:
+            upload = self.state.uploads.get(session_id)
+        if upload is None:
+            self._send(404, {"error": {"code": 404, "message": "Unknown upload"}})
+            return
+        upload["received"] += len(body)
+
+        command = self.headers.get("X-Goog-Upload-Command", "")
+        if "finalize" not in command:
+            self.state.gemini.delay(len(body))
+            self._send(200, {}, {"X-Goog-Upload-Status": "active"})
+            return
+
+        if not self._gate(self.state.gemini, "gemini_upload", len(body)):
+            return
+        name = f"files/{session_id[:12]}"
+        now = datetime.now(timezone.utc)
+        file_record = {
+            "name": name,
+            "uri": f"http://{self.headers.get('Host')}/v1beta/{name}",
+            "mimeType": upload["mime_type"],
+            "sizeBytes": str(upload["received"]),
+            "createTime": _iso(now),
+            "expirationTime": _iso(now + timedelta(hours=48)),
+            "ready_at": time.monotonic() + self.state.file_processing_seconds,
+        }
+        with self.state.lock:
+            self.state.uploads.pop(session_id, None)
+            self.state.files[name] = file_record
+        self._send(
+            200, {"file": self._file(name)}, {"X-Goog-Upload-Status": "final"}
+        )
+
+    def _file(self, name: str) -> Optional[Dict[str, Any]]:
+        with self.state.lock:
+            record = self.state.files.get(name)
+        if record is None:
+            return None
+        ready = time.monotonic() >= record["ready_at"]
+        result = {k: v for k, v in record.items() if k != "ready_at"}
+        result["state"] = "ACTIVE" if ready else "PROCESSING"
+        return result
+
+    def _generate(self, request: Dict[str, Any]):
+        answer = fake_generation(request)
+        text = answer if isinstance(answer, str) else json.dumps(answer)
+        prompt_tokens = len(json.dumps(request)) // 4
+        self._send(
+            200,
+            {
+                "candidates": [
+                    {
+                        "content": {"role": "model", "parts": [{"text": text}]},
+                        "finishReason": "STOP",
+                    }
+                ],
+                "usageMetadata": {
+                    "promptTokenCount": prompt_tokens,
+                    "candidatesTokenCount": len(text) // 4,
+                    "totalTokenCount": prompt_tokens + len(text) // 4,
+                },
+            },
+        )
+
+    def _create_cache(self, request: Dict[str, Any]):
+        self.state.count("gemini_cache_creates")
+        ttl = float(str(request.get("ttl", "3600s")).rstrip("s") or 3600)
+        now = datetime.now(timezone.utc)
+        self._send(
+            200,
+            {
+                "name": f"cachedContents/{uuid.uuid4().hex[:12]}",
+                "model": request.get("model"),
+                "createTime": _iso(now),
+                "expireTime": _iso(now + timedelta(seconds=ttl)),
+            },
+        )
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], state: MockState):
+        super().__init__(address, MockProviderHandler)
+        self.state = state
+
+
+def start_mock_server(
+    host: str = "127.0.0.1", port: int = 9100, **options: Any
+) -> MockProviderServer:
+    """
+    Start the mock server in a background thread and return it.
+
+    ``options`` are ``azure_*``/``gemini_*`` ProviderBehaviour fields (e.g.
+    ``gemini_latency_seconds``) and MockState fields.
+    """
+    behaviours = {}
+    for provider in ("azure", "gemini"):
+        prefix = f"{provider}_"
+        behaviours[provider] = ProviderBehaviour(
+            **{
+                key[len(prefix) :]: options.pop(key)
+                for key in list(options)
+                if key.startswith(prefix)
+            }
+        )
+    state = MockState(azure=behaviours["azure"], gemini=behaviours["gemini"], **options)
+    server = MockProviderServer((host, port), state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Mock providers listening on http://{host}:{server.server_port}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for provider, latency in (("azure", 2.0), ("gemini", 3.0)):
+        parser.add_argument(f"--{provider}-latency", type=float, default=latency)
+        parser.add_argument(f"--{provider}-rps", type=float, default=0.0)
+        parser.add_argument(f"--{provider}-failure-rate", type=float, default=0.0)
+    parser.add_argument("--file-processing-seconds", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = start_mock_server(
+        args.host,
+        args.port,
+        azure_latency_seconds=args.azure_latency,
+        azure_max_requests_per_second=args.azure_rps,
+        azure_failure_rate=args.azure_failure_rate,
+        gemini_latency_seconds=args.gemini_latency,
+        gemini_max_requests_per_second=args.gemini_rps,
+        gemini_failure_rate=args.gemini_failure_rate,
+        file_processing_seconds=args.file_processing_seconds,
+    )
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"Counters: {server.state.counters}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
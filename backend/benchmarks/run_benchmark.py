@@ -0,0 +1,368 @@
+"""
+Drive /api/v1/upload at controlled concurrency against mock providers.
+
+Run from the backend directory:
+
+    python -m benchmarks.run_benchmark --scenario baseline
+
+By default the mock providers and an API server wired to them are started
+locally; pass --api-url to benchmark an already running deployment instead.
+The report (jobs/hour, end-to-end and per-stage latency percentiles, CPU
+and memory of the API process) is printed and written as JSON.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from benchmarks.mock_providers import start_mock_server
+from benchmarks.synthetic_videos import VideoSpec, ensure_videos
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FINAL_STATUSES = {"completed", "failed", "cancelled"}
+POLL_INTERVAL_SECONDS = 0.5
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "baseline": {
+        "jobs": 20,
+        "concurrency": 4,
+        "video_seconds": [60],
+        "mock": {"azure_latency_seconds": 2.0, "gemini_latency_seconds": 3.0},
+        "env": {},
+    },
+    "throttled": {
+        "jobs": 20,
+        "concurrency": 8,
+        "video_seconds": [60],
+        "mock": {
+            "azure_latency_seconds": 2.0,
+            "gemini_latency_seconds": 3.0,
+            "gemini_max_requests_per_second": 2,
+        },
+        "env": {"GEMINI_REQUESTS_PER_MINUTE": "100"},
+    },
+    "flaky": {
+        "jobs": 20,
+        "concurrency": 4,
+        "video_seconds": [60],
+        "mock": {
+            "azure_latency_seconds": 2.0,
+            "gemini_latency_seconds": 3.0,
+            "azure_failure_rate": 0.05,
+            "gemini_failure_rate": 0.05,
+        },
+        "env": {},
+    },
+    "long_videos": {
+        "jobs": 6,
+        "concurrency": 3,
+        "video_seconds": [600, 1200],
+        "mock": {
+            "azure_latency_seconds": 10.0,
+            "gemini_latency_seconds": 15.0,
+            "gemini_latency_per_mb_seconds": 0.05,
+        },
+        "env": {},
+    },
+    "batched_scoring": {
+        "jobs": 20,
+        "concurrency": 8,
+        "video_seconds": [60],
+        "mock": {"azure_latency_seconds": 2.0, "gemini_latency_seconds": 3.0},
+        "env": {
+            "SCORING_BATCH_ENABLED": "true",
+            "SCORING_BATCH_MAX_WAIT_SECONDS": "5",
+        },
+    },
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Nearest-rank p50/p90/p99 and max."""
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)], 3)
+
+    return {
+        "p50": rank(50),
+        "p90": rank(90),
+        "p99": rank(99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class ProcessSampler:
+    """
+    Sample CPU time and resident memory of a local process from /proc.
+    """
+
+    def __init__(self, pid: int, interval_seconds: float = 1.0):
+        self.pid = pid
+        self.interval_seconds = interval_seconds
+        self.peak_rss_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start_cpu = self.cpu_seconds()
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime, stime, cutime, cstime (ffmpeg children count once reaped)
+        ticks = sum(int(value) for value in fields[11:15])
+        return ticks / os.sysconf("SC_CLK_TCK")
+
+    def rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.peak_rss_bytes = max(self.peak_rss_bytes, self.rss_bytes())
+            except OSError:
+                return
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Dict[str, float]:
+        self._stop.set()
+        self._thread.join()
+        return {
+            "cpu_seconds": round(self.cpu_seconds() - self._start_cpu, 3),
+            "peak_rss_mb": round(self.peak_rss_bytes / (1024 * 1024), 1),
+        }
+
+
+def start_api_server(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start the backend with uvicorn and wait until /health answers."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return process
+        except requests.ConnectionError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        time.sleep(0.5)
+    process.kill()
+    raise RuntimeError("API server did not become healthy")
+
+
+def run_job(
+    api_url: str, video_path: str, tenant: str, unique: bool = True
+) -> Dict[str, Any]:
+    """
+    Upload one video and poll until the job reaches a final status.
+
+    With ``unique``, random trailing bytes (ignored by decoders) make every
+    upload distinct, so identical videos are not merged into one pipeline.
+    """
+    with open(video_path, "rb") as f:
+        content = f.read()
+    if unique:
+        content += os.urandom(16)
+
+    started = time.monotonic()
+    response = requests.post(
+        f"{api_url}/api/v1/upload",
+        files={"file": (os.path.basename(video_path), content, "video/mp4")},
+        data={"tenant": tenant},
+        timeout=600,
+    )
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    upload_seconds = time.monotonic() - started
+
+    while True:
+        status = requests.get(f"{api_url}/api/v1/status/{job_id}", timeout=30).json()
+        if status["status"] in FINAL_STATUSES:
+            break
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+    return {
+        "job_id": job_id,
+        "status": status["status"],
+        "error": status.get("error"),
+        "upload_seconds": upload_seconds,
+        "total_seconds": time.monotonic() - started,
+        "timings": status.get("timings") or {},
+    }
+
+
+def summarize(results: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    completed = [r for r in results if r["status"] == "completed"]
+    stage_durations: Dict[str, List[float]] = {}
+    stage_cpu: Dict[str, float] = {}
+    for result in completed:
+        for stage, timing in result["timings"].items():
+            duration = timing.get("duration_seconds")
+            if duration is not None:
+                stage_durations.setdefault(stage, []).append(duration)
+            cpu_seconds = timing.get("cpu_seconds") or 0.0
+            stage_cpu[stage] = stage_cpu.get(stage, 0.0) + cpu_seconds
+
+    errors: Dict[str, int] = {}
+    for result in results:
+        if result["status"] != "completed":
+            key = (result["error"] or result["status"])[:120]
+            errors[key] = errors.get(key, 0) + 1
+
+    return {
+        "jobs": len(results),
+        "completed": len(completed),
+        "failed": len(results) - len(completed),
+        "wall_seconds": round(wall_seconds, 3),
+        "jobs_per_hour": round(len(completed) / wall_seconds * 3600, 1),
+        "end_to_end_seconds": percentiles([r["total_seconds"] for r in completed]),
+        "upload_seconds": percentiles([r["upload_seconds"] for r in results]),
+        "stage_seconds": {
+            stage: percentiles(values) for stage, values in stage_durations.items()
+        },
+        "stage_cpu_seconds_total": {
+            stage: round(value, 3) for stage, value in stage_cpu.items()
+        },
+        "errors": errors,
+    }
+
+
+def run_scenario(
+    scenario: Dict[str, Any],
+    api_url: Optional[str],
+    video_dir: str,
+    mock_port: int,
+    api_port: int,
+    unique: bool = True,
+) -> Dict[str, Any]:
+    videos = ensure_videos(
+        video_dir, [VideoSpec(seconds) for seconds in scenario["video_seconds"]]
+    )
+
+    mock_server = None
+    api_process = None
+    sampler = None
+    try:
+        if api_url is None:
+            mock_server = start_mock_server(port=mock_port, **scenario["mock"])
+            mock_url = f"http://127.0.0.1:{mock_server.server_port}"
+            api_process = start_api_server(
+                api_port,
+                {
+                    "AZURE_SPEECH_ENDPOINT": mock_url,
+                    "AZURE_SUBSCRIPTION_KEY": "benchmark",
+                    "GEMINI_BASE_URL": mock_url,
+                    "GEMINI_API_KEY": "benchmark",
+                    **scenario["env"],
+                },
+            )
+            api_url = f"http://127.0.0.1:{api_port}"
+            sampler = ProcessSampler(api_process.pid)
+            sampler.start()
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=scenario["concurrency"]) as pool:
+            futures = [
+                pool.submit(
+                    run_job,
+                    api_url,
+                    videos[i % len(videos)],
+                    f"tenant-{i % 2}",
+                    unique,
+                )
+                for i in range(scenario["jobs"])
+            ]
+            results = [future.result() for future in futures]
+        report = summarize(results, time.monotonic() - started)
+
+        if sampler:
+            report["api_process"] = sampler.stop()
+        if mock_server:
+            report["mock_counters"] = dict(mock_server.state.counters)
+        return report
+    finally:
+        if api_process:
+            api_process.terminate()
+            api_process.wait(timeout=30)
+        if mock_server:
+            mock_server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="baseline")
+    parser.add_argument("--jobs", type=int, help="Override the scenario job count")
+    parser.add_argument("--concurrency", type=int, help="Concurrent uploads")
+    parser.add_argument(
+        "--video-seconds", type=int, nargs="+", help="Synthetic video durations"
+    )
+    parser.add_argument("--api-url", help="Benchmark a running API instead")
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--mock-port", type=int, default=9100)
+    parser.add_argument(
+        "--video-dir",
+        default=os.path.join(tempfile.gettempdir(), "interview-benchmark-videos"),
+        help="Where synthetic videos are generated and reused between runs",
+    )
+    parser.add_argument(
+        "--allow-duplicates",
+        action="store_true",
+        help="Upload identical bytes so duplicate jobs share one pipeline",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    scenario = dict(SCENARIOS[args.scenario])
+    for key in ("jobs", "concurrency", "video_seconds"):
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+
+    report = run_scenario(
+        scenario,
+        args.api_url,
+        args.video_dir,
+        args.mock_port,
+        args.api_port,
+        unique=not args.allow_duplicates,
+    )
+    report = {"scenario": args.scenario, **scenario, **report}
+    output = json.dumps(report, indent=4)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
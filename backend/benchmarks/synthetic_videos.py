@@ -0,0 +1,73 @@
+"""
+Synthetic interview videos generated with ffmpeg's test sources.
+"""
+
+import logging
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class VideoSpec:
+    duration_seconds: int
+    width: int = 1280
+    height: int = 720
+    fps: int = 25
+
+    @property
+    def filename(self) -> str:
+        return (
+            f"synthetic_{self.duration_seconds}s_{self.width}x{self.height}"
+            f"_{self.fps}fps.mp4"
+        )
+
+
+def generate_video(spec: VideoSpec, path: str):
+    """
+    Render a test pattern with a tone, encoded like a typical webcam upload.
+    """
+    command = [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc2=duration={spec.duration_seconds}:size={spec.width}x{spec.height}"
+        f":rate={spec.fps}",
+        "-f",
+        "lavfi",
+        "-i",
+        f"sine=frequency=220:beep_factor=4:duration={spec.duration_seconds}",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "aac",
+        "-shortest",
+        "-y",
+        path,
+    ]
+    subprocess.run(command, check=True, capture_output=True, text=True)
+
+
+def ensure_videos(directory: str, specs: List[VideoSpec]) -> List[str]:
+    """
+    Return paths to videos matching ``specs``, generating any that are missing.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for spec in specs:
+        path = os.path.join(directory, spec.filename)
+        if not os.path.exists(path):
+            logger.info(f"Generating {path}")
+            generate_video(spec, path)
+        paths.append(path)
+    return paths